@@ -0,0 +1,387 @@
+"""Benchmarks for spelling_bee.py.
+
+Run a benchmark by name, e.g.::
+
+    python benchmarks.py startup --runs 10 --max-import-ms 80
+    python benchmarks.py scoring --rows 1000000
+    python benchmarks.py alignment --rows 200000
+    python benchmarks.py nearwords --words 300000
+    python benchmarks.py difficulty --words 300000
+
+Each benchmark prints a short report and exits with status 1 if a
+``--max-*``/``--min-*`` budget it was given is missed or a correctness
+check fails, so it can gate CI.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Modules that should only load once the game actually needs them
+HEAVY_MODULES = (
+    "argparse", "colorama", "concurrent.futures", "http.client", "json",
+    "pyttsx3", "sqlite3", "subprocess",
+)
+
+_FIRST_PROMPT_SCRIPT = """
+import builtins, sys, time
+start = time.perf_counter()
+import spelling_bee
+
+def first_prompt(prompt=""):
+    print(f"FIRST_PROMPT {time.perf_counter() - start:.6f}", file=sys.stderr)
+    raise KeyboardInterrupt
+
+builtins.input = first_prompt
+try:
+    spelling_bee.main([])
+except (KeyboardInterrupt, SystemExit):
+    pass
+"""
+
+
+def _run(args, env=None):
+    return subprocess.run([sys.executable, *args], cwd=HERE, env=env,
+                          capture_output=True, text=True, timeout=120)
+
+
+def parse_importtime(stderr):
+    """Return ``(name, depth, self_us, cumulative_us)`` rows from ``-X importtime`` output.
+
+    Rows are in output order, so a module's dependencies come right
+    before it, one level deeper.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the column header
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+    return rows
+
+
+def direct_imports(rows, module):
+    """Return the rows ``module`` imported directly, from the last import of it."""
+    names = [row[0] for row in rows]
+    end = len(names) - 1 - names[::-1].index(module)
+    depth = rows[end][1]
+    children = []
+    for row in reversed(rows[:end]):
+        if row[1] <= depth:
+            break
+        if row[1] == depth + 1:
+            children.append(row)
+    return children[::-1]
+
+
+def measure_import():
+    """Import spelling_bee in a fresh interpreter; return its importtime rows."""
+    result = _run(["-X", "importtime", "-c", "import spelling_bee"])
+    result.check_returncode()
+    return parse_importtime(result.stderr)
+
+
+def loaded_heavy_modules():
+    """Return the HEAVY_MODULES that a bare ``import spelling_bee`` loads."""
+    code = ("import sys, spelling_bee; "
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))")
+    result = _run(["-c", code])
+    result.check_returncode()
+    return result.stdout.split()
+
+
+def measure_help():
+    """Return the wall time, in seconds, of ``spelling_bee.py --help``."""
+    start = time.perf_counter()
+    _run(["spelling_bee.py", "--help"]).check_returncode()
+    return time.perf_counter() - start
+
+
+def measure_first_prompt():
+    """Return seconds from import to the first input prompt, or None.
+
+    None means the game could not get that far here, usually because no
+    text-to-speech engine is available.  The cache directory is a fresh
+    temporary one, so this is the cold-cache path.
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, SPELLING_BEE_CACHE_DIR=cache_dir)
+        result = _run(["-c", _FIRST_PROMPT_SCRIPT], env=env)
+    for line in result.stderr.splitlines():
+        if line.startswith("FIRST_PROMPT "):
+            return float(line.split()[1])
+    return None
+
+
+def bench_startup(args):
+    imports = [measure_import() for _ in range(args.runs)]
+    totals = [dict((row[0], row[3]) for row in rows)["spelling_bee"] / 1000
+              for rows in imports]
+    import_ms = statistics.median(totals)
+    print(f"import spelling_bee: median {import_ms:.1f}ms, "
+          f"min {min(totals):.1f}ms over {args.runs} runs")
+    # Slowest direct dependencies in the median run
+    rows = imports[totals.index(sorted(totals)[len(totals) // 2])]
+    deps = sorted(direct_imports(rows, "spelling_bee"), key=lambda row: -row[3])
+    for name, _, _, cumulative in deps[:5]:
+        print(f"  {name:<24} {cumulative / 1000:6.1f}ms")
+    heavy = loaded_heavy_modules()
+    print(f"heavy modules loaded at import: {', '.join(heavy) or 'none'}")
+
+    help_ms = statistics.median(measure_help() for _ in range(args.runs)) * 1000
+    print(f"spelling_bee.py --help: median {help_ms:.1f}ms")
+    first = measure_first_prompt()
+    if first is None:
+        print("first prompt: not reached (no text-to-speech engine?)")
+    else:
+        print(f"first prompt: {first * 1000:.1f}ms after import started")
+
+    failed = False
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        print(f"FAIL: import took {import_ms:.1f}ms, budget is {args.max_import_ms}ms")
+        failed = True
+    if args.max_help_ms is not None and help_ms > args.max_help_ms:
+        print(f"FAIL: --help took {help_ms:.1f}ms, budget is {args.max_help_ms}ms")
+        failed = True
+    if args.strict and heavy:
+        print(f"FAIL: imported eagerly: {', '.join(heavy)}")
+        failed = True
+    return failed
+
+
+def make_attempts(rows, seed=0):
+    """Return ``rows`` (expected, attempt) pairs with a mix of typical mistakes."""
+    from spelling_bee import WORD_LIST
+
+    rng = random.Random(seed)
+    expected, attempts = [], []
+    for _ in range(rows):
+        word = rng.choice(WORD_LIST)
+        i = rng.randrange(len(word))
+        attempt = rng.choice([
+            word, word, word.upper(), word[:i] + word[i + 1:],
+            word[:i] + "e" + word[i + 1:], word[:i] + word[i] + word[i:],
+        ])
+        expected.append(word)
+        attempts.append(attempt)
+    return expected, attempts
+
+
+def bench_scoring(args):
+    import spelling_bee
+
+    expected, attempts = make_attempts(args.rows)
+    start = time.perf_counter()
+    reference = spelling_bee._score_pairs(expected, attempts)
+    pairs_s = time.perf_counter() - start
+    print(f"compare, one pair at a time: {args.rows / pairs_s:,.0f} rows/s")
+    if spelling_bee._numpy() is None:
+        print("score_batch: numpy is not installed, same as above")
+        return False
+    start = time.perf_counter()
+    batch = spelling_bee.score_batch(expected, attempts)
+    batch_s = time.perf_counter() - start
+    print(f"score_batch (numpy): {args.rows / batch_s:,.0f} rows/s, "
+          f"{pairs_s / batch_s:.1f}x faster")
+    if batch != reference:
+        print("FAIL: score_batch disagrees with compare")
+        return True
+    return False
+
+
+def bench_alignment(args):
+    import spelling_bee
+
+    expected, attempts = make_attempts(args.rows)
+    attempts = [attempt.strip() for attempt in attempts]
+    scorers = [
+        ("compare (positional)", spelling_bee.compare),
+        ("edit_distance (bit-parallel)", spelling_bee.edit_distance),
+        ("align (distance + marks)", spelling_bee.align),
+    ]
+    rates = {}
+    for name, scorer in scorers:
+        start = time.perf_counter()
+        for word, attempt in zip(expected, attempts):
+            scorer(word, attempt)
+        rates[name] = args.rows / (time.perf_counter() - start)
+        print(f"{name:<30} {rates[name]:>12,.0f} pairs/s  {rates[name] * 60 / 1e6:6.1f}M pairs/min")
+    align_rate = rates["align (distance + marks)"]
+    if args.min_pairs_per_min is not None and align_rate * 60 < args.min_pairs_per_min:
+        print(f"FAIL: align scored {align_rate * 60:,.0f} pairs/min, "
+              f"budget is {args.min_pairs_per_min:,.0f}")
+        return True
+    return False
+
+
+def make_words(count, seed=0):
+    """Return WORD_LIST padded with pseudo-words up to ``count`` distinct entries."""
+    from spelling_bee import WORD_LIST
+
+    rng = random.Random(seed)
+    letters = "".join(WORD_LIST)  # English-like letter frequencies
+    words = dict.fromkeys(WORD_LIST)
+    while len(words) < count:
+        words["".join(rng.choices(letters, k=rng.randint(3, 12)))] = None
+    return list(words)[:count]
+
+
+def index_size(index):
+    """Estimate the bytes held by a NearWordIndex (key array and words)."""
+    size = sys.getsizeof(index._keys) + sys.getsizeof(index._words)
+    return size + sum(map(sys.getsizeof, index._words))
+
+
+def bench_nearwords(args):
+    import spelling_bee
+
+    words = make_words(args.words)
+    start = time.perf_counter()
+    index = spelling_bee.NearWordIndex(words, max_distance=args.distance)
+    build_s = time.perf_counter() - start
+    size_mib = index_size(index) / 2**20
+    print(f"built index over {len(index):,} words in {build_s:.2f}s, "
+          f"~{size_mib:.1f} MiB ({len(index._keys):,} delete/word pairs)")
+
+    rng = random.Random(1)
+    queries = []
+    for word in rng.sample(words, min(args.queries, len(words))):
+        i = rng.randrange(len(word))
+        queries.append(rng.choice([word[:i] + word[i + 1:], word[:i] + "e" + word[i:],
+                                   word[:i] + "a" + word[i + 1:]]))
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.lookup(query, limit=args.limit or None)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99)] * 1000
+    limit = f", closest {args.limit}" if args.limit else ""
+    print(f"lookup within distance {args.distance}{limit}: median {p50:.3f}ms, "
+          f"p99 {p99:.3f}ms over {len(queries)} misspellings")
+    failed = False
+    if args.max_mib is not None and size_mib > args.max_mib:
+        print(f"FAIL: index holds ~{size_mib:.1f} MiB, budget is {args.max_mib} MiB")
+        failed = True
+    if args.max_lookup_ms is not None and p50 > args.max_lookup_ms:
+        print(f"FAIL: median lookup took {p50:.3f}ms, budget is {args.max_lookup_ms}ms")
+        failed = True
+    return failed
+
+
+def bench_difficulty(args):
+    import spelling_bee
+
+    words = make_words(args.words)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "words.table")
+        start = time.perf_counter()
+        spelling_bee.DifficultyTable.write(path, words)
+        build_s = time.perf_counter() - start
+        start = time.perf_counter()
+        table = spelling_bee.DifficultyTable(path)
+        open_ms = (time.perf_counter() - start) * 1000
+        print(f"precomputed {len(table):,} words in {build_s:.2f}s, "
+              f"{os.path.getsize(path) / 2**20:.1f} MiB, opened in {open_ms:.2f}ms")
+
+        bands = {word: table.features(word)["band"] for word in words}
+        timings = {}
+        for name, pick in (
+            ("table", lambda band: table.sample(15, args.max_length, band=band)),
+            ("filter", lambda band: random.sample(
+                [w for w in words if len(w) <= args.max_length and bands[w] == band], 15)),
+        ):
+            runs = args.samples if name == "table" else max(1, args.samples // 100)
+            start = time.perf_counter()
+            for i in range(runs):
+                picked = pick(spelling_bee.DIFFICULTY_BANDS[i % 3])
+            timings[name] = (time.perf_counter() - start) / runs * 1000
+            if any(bands[word] != spelling_bee.DIFFICULTY_BANDS[(runs - 1) % 3]
+                   for word in picked):
+                print(f"FAIL: {name} sampled a word outside its band")
+                return True
+        table.close()
+    print(f"15 words from one band: table {timings['table']:.4f}ms, "
+          f"filtering the list {timings['filter']:.2f}ms "
+          f"({timings['filter'] / timings['table']:.0f}x)")
+    if args.max_sample_ms is not None and timings["table"] > args.max_sample_ms:
+        print(f"FAIL: sampling took {timings['table']:.4f}ms, budget is {args.max_sample_ms}ms")
+        return True
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    benchmarks = parser.add_subparsers(dest="benchmark", required=True)
+    startup = benchmarks.add_parser(
+        "startup", help="import, --help and first-prompt latency (-X importtime)",
+    )
+    startup.add_argument("--runs", type=int, default=5,
+                         help="fresh interpreters per measurement (default: 5)")
+    startup.add_argument("--max-import-ms", type=float, default=None,
+                         help="fail if the median import time exceeds this")
+    startup.add_argument("--max-help-ms", type=float, default=None,
+                         help="fail if the median --help time exceeds this")
+    startup.add_argument("--strict", action="store_true",
+                         help="fail if any heavy module is imported eagerly")
+    startup.set_defaults(run=bench_startup)
+    scoring = benchmarks.add_parser(
+        "scoring", help="batch scoring throughput, score_batch against compare",
+    )
+    scoring.add_argument("--rows", type=int, default=200000,
+                         help="attempts to score (default: 200000)")
+    scoring.set_defaults(run=bench_scoring)
+    alignment = benchmarks.add_parser(
+        "alignment", help="edit-distance alignment throughput against positional compare",
+    )
+    alignment.add_argument("--rows", type=int, default=200000,
+                           help="pairs to score (default: 200000)")
+    alignment.add_argument("--min-pairs-per-min", type=float, default=None,
+                           help="fail if align scores fewer pairs per minute than this")
+    alignment.set_defaults(run=bench_alignment)
+    nearwords = benchmarks.add_parser(
+        "nearwords", help="did-you-mean index build time, memory and lookup latency",
+    )
+    nearwords.add_argument("--words", type=int, default=100000,
+                           help="index size, padded with pseudo-words (default: 100000)")
+    nearwords.add_argument("--distance", type=int, default=2,
+                           help="maximum edit distance (default: 2)")
+    nearwords.add_argument("--queries", type=int, default=2000,
+                           help="misspellings to look up (default: 2000)")
+    nearwords.add_argument("--limit", type=int, default=5,
+                           help="suggestions per lookup, 0 for all (default: 5)")
+    nearwords.add_argument("--max-lookup-ms", type=float, default=None,
+                           help="fail if the median lookup takes longer than this")
+    nearwords.add_argument("--max-mib", type=float, default=None,
+                           help="fail if the index holds more memory than this")
+    nearwords.set_defaults(run=bench_nearwords)
+    difficulty = benchmarks.add_parser(
+        "difficulty", help="difficulty table precompute time and band sampling latency",
+    )
+    difficulty.add_argument("--words", type=int, default=100000,
+                            help="list size, padded with pseudo-words (default: 100000)")
+    difficulty.add_argument("--max-length", type=int, default=8,
+                            help="longest word to sample (default: 8)")
+    difficulty.add_argument("--samples", type=int, default=10000,
+                            help="band samples to time (default: 10000)")
+    difficulty.add_argument("--max-sample-ms", type=float, default=None,
+                            help="fail if one 15-word band sample takes longer than this")
+    difficulty.set_defaults(run=bench_difficulty)
+    args = parser.parse_args(argv)
+    sys.exit(1 if args.run(args) else 0)
+
+
+if __name__ == "__main__":
+    main()
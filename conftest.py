@@ -1,8 +1,43 @@
+import threading
+
 import pytest
 
+import spelling_bee
+
 
 def pytest_configure(config):
     config.addinivalue_line(
         "markers",
         "integration: tests that hit the live Free Dictionary API (may be slow)",
     )
+
+
+def _no_network(*args, **kwargs):
+    raise OSError("network access is disabled outside integration tests")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_caches(request, tmp_path, monkeypatch):
+    """Start every test with empty caches kept in a temporary directory.
+
+    Unit tests also get a dictionary client that cannot reach the
+    network, so background lookups they trigger fail fast.
+    """
+    monkeypatch.setenv("SPELLING_BEE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("SPELLING_BEE_BUNDLE", raising=False)
+    monkeypatch.setattr(spelling_bee, "_disk_cache", None)
+    monkeypatch.setattr(spelling_bee, "_word_bundle", None)
+    monkeypatch.setattr(spelling_bee, "_difficulty_table", None)
+    monkeypatch.setattr(spelling_bee, "_dictionary_breaker", spelling_bee.CircuitBreaker())
+    monkeypatch.setattr(spelling_bee, "_word_lookups", spelling_bee.SingleFlight())
+    if request.node.get_closest_marker("integration") is None:
+        monkeypatch.setattr(spelling_bee, "_dictionary_client",
+                            spelling_bee.DictionaryClient(connection_class=_no_network))
+    spelling_bee._word_cache.clear()
+    spelling_bee._negative_cache.clear()
+    yield
+    for thread in threading.enumerate():
+        if thread.name.startswith("speculate-"):
+            thread.join(timeout=5)
+    spelling_bee._word_cache.clear()
+    spelling_bee._negative_cache.clear()
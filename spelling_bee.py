@@ -1,14 +1,57 @@
-import json
+import array
+import bisect
+import importlib
+import math
+import mmap
 import os
 import random
-import shutil
-import subprocess
+import struct
 import sys
-import urllib.parse
-import urllib.request
+import threading
+import time
+from collections import Counter, OrderedDict
 
-import pyttsx3
-from colorama import Fore, Style, init
+
+class _LazyImport:
+    """Placeholder for a module, or a name from one, imported on first use.
+
+    The first attribute access or call imports the real object and puts it
+    in this module's globals in place of the placeholder, so later uses
+    cost nothing extra.
+    """
+
+    def __init__(self, module, attr=None):
+        self._module = module
+        self._attr = attr
+        self._name = attr or module.rpartition(".")[2]
+
+    def _load(self):
+        target = importlib.import_module(self._module)
+        if self._attr is not None:
+            target = getattr(target, self._attr)
+        if globals().get(self._name) is self:
+            globals()[self._name] = target
+        return target
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __call__(self, *args, **kwargs):
+        return self._load()(*args, **kwargs)
+
+
+# Heavier dependencies load when first used, so ``--help`` and the batch
+# subcommands don't pay for the TTS stack.  ``python benchmarks.py startup``
+# tracks the import cost.
+json = _LazyImport("json")
+queue = _LazyImport("queue")
+shutil = _LazyImport("shutil")
+sqlite3 = _LazyImport("sqlite3")
+subprocess = _LazyImport("subprocess")
+pyttsx3 = _LazyImport("pyttsx3")
+Fore = _LazyImport("colorama", "Fore")
+Style = _LazyImport("colorama", "Style")
+init = _LazyImport("colorama", "init")
 
 
 # Curated list of common English words suitable for a spelling bee.
@@ -290,6 +333,800 @@ WORD_LIST = [
 ]
 
 
+class WordIndex:
+    """Length-bucketed index over a word list.
+
+    Words are stored grouped by length, and ``_offsets[n]`` holds the
+    number of words shorter than ``n``.  All words within a length range
+    therefore occupy one contiguous slice, so sampling is a
+    ``random.sample`` over a ``range`` -- O(k), with no copying or
+    shuffling of the underlying list.
+    """
+
+    def __init__(self, words):
+        self.source = words
+        longest = max(map(len, words), default=0)
+        counts = [0] * (longest + 1)
+        for word in words:
+            counts[len(word)] += 1
+        offsets = [0] * (longest + 2)
+        for length, count in enumerate(counts):
+            offsets[length + 1] = offsets[length] + count
+        slots = offsets[:-1]
+        ordered = [None] * len(words)
+        for word in words:
+            ordered[slots[len(word)]] = word
+            slots[len(word)] += 1
+        self._words = tuple(ordered)
+        self._offsets = tuple(offsets)
+
+    def __len__(self):
+        return len(self._words)
+
+    def __iter__(self):
+        return iter(self._words)
+
+    def _span(self, min_length, max_length):
+        last = len(self._offsets) - 1
+        lo = self._offsets[min(max(min_length, 0), last)]
+        hi = self._offsets[min(max(max_length + 1, 0), last)]
+        return lo, max(lo, hi)
+
+    def count(self, max_length, min_length=1):
+        """Return how many words have ``min_length <= len(word) <= max_length``."""
+        lo, hi = self._span(min_length, max_length)
+        return hi - lo
+
+    def sample(self, k, max_length, min_length=1):
+        """Return up to ``k`` distinct random words within the length range."""
+        lo, hi = self._span(min_length, max_length)
+        picks = random.sample(range(lo, hi), min(k, hi - lo))
+        return [self._words[i] for i in picks]
+
+    def choice(self, max_length, min_length=1):
+        """Return one random word within the length range.
+
+        Raises IndexError if no word fits, like ``random.choice([])``.
+        """
+        lo, hi = self._span(min_length, max_length)
+        if lo == hi:
+            raise IndexError("no words within the requested length range")
+        return self._words[random.randrange(lo, hi)]
+
+
+_word_index = None
+
+
+def _get_word_index():
+    """Return the index over WORD_LIST, building it on first use or if the list was replaced."""
+    global _word_index
+    if _word_index is None or _word_index.source is not WORD_LIST:
+        _word_index = WordIndex(WORD_LIST)
+    return _word_index
+
+
+class NearWordIndex:
+    """Symmetric-delete (SymSpell) index of the real words near a spelling.
+
+    Every word is filed under each string reachable from it by deleting
+    up to ``max_distance`` letters.  Two words within edit distance k
+    always share such a string, so a lookup only has to generate the
+    deletes of the query and verify the few words filed under them,
+    rather than compare against the whole list.  Only the first
+    ``prefix_length`` letters are indexed, which caps the deletes per
+    word however long it is.  Each (delete, word) pair is packed into one
+    64-bit integer, a 32-bit hash of the delete above the word's index,
+    and kept in a sorted array that lookups search with ``bisect``.  That
+    costs 8 bytes per pair, about 70 MiB for 300,000 words (see
+    ``benchmarks.py nearwords``).  Hash collisions only add candidates
+    that verification rejects.
+    """
+
+    def __init__(self, words, max_distance=2, prefix_length=7):
+        if prefix_length <= max_distance:
+            raise ValueError("prefix_length must exceed max_distance")
+        self.source = words
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._words = list(dict.fromkeys(word.lower() for word in words))
+        if len(self._words) > 0xFFFFFFFF:
+            raise ValueError("too many words for a NearWordIndex")
+        # Bucket by the top byte of the hash so that each sort only holds
+        # a small slice of the pairs as Python ints.
+        buckets = [array.array("Q") for _ in range(256)]
+        for i, word in enumerate(self._words):
+            for level in self._variants(word[:prefix_length], max_distance):
+                for variant in level:
+                    key = hash(variant) & 0xFFFFFFFF
+                    buckets[key >> 24].append(key << 32 | i)
+        self._keys = array.array("Q")
+        for n in range(len(buckets)):
+            self._keys.extend(sorted(buckets[n]))
+            buckets[n] = None
+
+    @staticmethod
+    def _variants(word, distance):
+        """Yield sets of the strings made by deleting 0, 1, ... ``distance`` letters."""
+        seen = level = {word}
+        yield level
+        for _ in range(distance):
+            level = {variant[:i] + variant[i + 1:]
+                     for variant in level for i in range(len(variant))} - seen
+            if not level:
+                return
+            seen = seen | level
+            yield level
+
+    def __len__(self):
+        return len(self._words)
+
+    def __contains__(self, word):
+        return bool(self.lookup(word, max_distance=0))
+
+    def lookup(self, term, max_distance=None, limit=None):
+        """Return ``(word, distance)`` for the words within ``max_distance`` of ``term``.
+
+        Closest first, then alphabetical; at most ``limit`` results.
+        Distances are case-insensitive Levenshtein distances.  With a
+        limit, the search stops once that many words are known to be
+        closer than anything still unexplored.
+        """
+        k = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        term = term.lower()
+        keys = self._keys
+        seen = set()
+        found = []
+        for deleted, level in enumerate(self._variants(term[:self.prefix_length], k)):
+            for variant in level:
+                key = hash(variant) & 0xFFFFFFFF
+                j = bisect.bisect_left(keys, key << 32)
+                while j < len(keys) and keys[j] >> 32 == key:
+                    i = keys[j] & 0xFFFFFFFF
+                    j += 1
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    word = self._words[i]
+                    if abs(len(word) - len(term)) > k:
+                        continue
+                    distance = edit_distance(word, term)
+                    if distance <= k:
+                        found.append((distance, word))
+            # Every word within ``deleted`` edits has now been found
+            if limit is not None and sum(d <= deleted for d, _ in found) >= limit:
+                break
+        found.sort()
+        return [(word, distance) for distance, word in found[:limit]]
+
+
+_near_words = None
+_near_words_lock = threading.Lock()
+
+
+def _get_near_words(words=None):
+    """Return the near-word index over ``words`` (WORD_LIST by default).
+
+    The index is built on first use and kept until another list is asked for.
+    """
+    global _near_words
+    source = WORD_LIST if words is None else words
+    with _near_words_lock:
+        if _near_words is None or _near_words.source is not source:
+            _near_words = NearWordIndex(source)
+        return _near_words
+
+
+class _MappedIndex:
+    """Shared plumbing for the read-only word indexes stored as flat arrays.
+
+    Subclasses define ``MAGIC``, ``_encode(*args)``, which returns the
+    file contents, ``_attach(buf, name)``, which reads them in place, and
+    ``_word_at(i)`` for the words that ``_spans`` ranges index into.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._attach(self._mm, path)
+        except ValueError:
+            self._mm.close()
+            raise
+
+    @classmethod
+    def build(cls, *args):
+        """Return an index over the same arguments as ``write``, held in memory."""
+        index = cls.__new__(cls)
+        index._mm = None
+        index._attach(cls._encode(*args), "<memory>")
+        return index
+
+    @classmethod
+    def write(cls, path, *args):
+        """Encode ``args`` (the words, and any extra data) and write them to ``path``."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(cls._encode(*args))
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def _pack(arrays):
+        """Return the bytes of ``arrays`` back to back, little-endian."""
+        if sys.byteorder != "little":
+            arrays = [array.array(values.typecode, values) for values in arrays]
+            for values in arrays:
+                values.byteswap()
+        return b"".join(values.tobytes() for values in arrays)
+
+    def _sections(self, buf, pos, layout):
+        """Return views of the consecutive ``(typecode, count)`` arrays from ``pos``.
+
+        The views are kept so that ``close`` can release them.
+        """
+        view = memoryview(buf)
+        self._views = [view]
+        sections = []
+        for code, count in layout:
+            size = array.array(code).itemsize
+            section = view[pos:pos + size * count].cast(code)
+            self._views.append(section)
+            if size > 1 and sys.byteorder != "little":
+                section = array.array(code, section)
+                section.byteswap()
+            sections.append(section)
+            pos += size * count
+        return sections
+
+    def _total(self, spans):
+        return sum(end - start for start, end in spans)
+
+    def _sample(self, k, spans):
+        sizes = [end - start for start, end in spans]
+        total = sum(sizes)
+        words = []
+        for pick in random.sample(range(total), min(k, total)):
+            for (start, _), size in zip(spans, sizes):
+                if pick < size:
+                    words.append(self._word_at(start + pick))
+                    break
+                pick -= size
+        return words
+
+    def _choice(self, spans):
+        words = self._sample(1, spans)
+        if not words:
+            raise IndexError("no words within the requested length range")
+        return words[0]
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        if self._mm is not None:
+            self._mm.close()
+
+
+class WordTrie(_MappedIndex):
+    """Compact, array-backed trie over a word list, memory-mapped from disk.
+
+    Built for large external vocabularies: shared prefixes are stored
+    once and every array is read in place, so opening a list of
+    hundreds of thousands of words costs a page fault rather than a
+    parse.  Nodes are numbered breadth-first, which keeps each node's
+    children contiguous; a word's rank is its position in UTF-8 byte
+    order, and subtree word counts turn a rank back into a word in one
+    walk down the trie.  Ranks grouped by word length give the same
+    length-filtered sampling as WordIndex.  Layout (little-endian)::
+
+        header    magic b"SBWT", u16 version, u16 reserved,
+                  u32 nodes, u32 words, u32 longest
+        children  (nodes + 1) x u32, node n's children are nodes
+                  children[n] .. children[n + 1] - 1
+        counts    nodes x u32, words ending in each node's subtree
+        ranks     words x u32, word ranks grouped by length, ascending
+        offsets   (longest + 2) x u32, words shorter than each length
+        labels    nodes x u8, the byte on the edge into each node
+        terminal  nodes x u8, 1 where a word ends
+    """
+
+    MAGIC = b"SBWT"
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHHIII")
+
+    def _attach(self, buf, name):
+        try:
+            magic, version, _, nodes, words, longest = self._HEADER.unpack_from(buf, 0)
+        except struct.error:
+            magic = version = None
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{name} is not a version {self.VERSION} word trie")
+        self._nodes, self._count, self._longest = nodes, words, longest
+        sections = self._sections(buf, self._HEADER.size, [
+            ("I", nodes + 1), ("I", nodes), ("I", words), ("I", longest + 2),
+            ("B", nodes), ("B", nodes),
+        ])
+        (self._children, self._counts, self._ranks, self._offsets,
+         self._labels, self._terminal) = sections
+
+    @classmethod
+    def _encode(cls, words):
+        keys = sorted({word.encode("utf-8") for word in words})
+        children, counts, labels, terminal = [], [], bytearray(), bytearray()
+        # Breadth-first over (first word, end word, depth) ranges of the sorted keys
+        pending = [(0, len(keys), 0, 0)]
+        for lo, hi, depth, label in pending:
+            children.append(len(pending))
+            counts.append(hi - lo)
+            labels.append(label)
+            ends = lo < hi and len(keys[lo]) == depth
+            terminal.append(ends)
+            i = lo + ends
+            while i < hi:
+                byte = keys[i][depth]
+                j = i + 1
+                while j < hi and keys[j][depth] == byte:
+                    j += 1
+                pending.append((i, j, depth + 1, byte))
+                i = j
+        children.append(len(pending))
+
+        lengths = [len(key.decode("utf-8")) for key in keys]
+        longest = max(lengths, default=0)
+        offsets = [0] * (longest + 2)
+        for length in lengths:
+            offsets[length + 1] += 1
+        for length in range(1, longest + 2):
+            offsets[length] += offsets[length - 1]
+        slots = offsets[:-1]
+        ranks = [0] * len(keys)
+        for rank, length in enumerate(lengths):
+            ranks[slots[length]] = rank
+            slots[length] += 1
+
+        header = cls._HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(counts), len(keys), longest)
+        arrays = [array.array("I", values) for values in (children, counts, ranks, offsets)]
+        return header + cls._pack(arrays) + bytes(labels) + bytes(terminal)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        """Yield every word in byte order."""
+        children, labels, terminal = self._children, self._labels, self._terminal
+        stack = [(0, b"")]
+        while stack:
+            node, key = stack.pop()
+            if terminal[node]:
+                yield key.decode("utf-8")
+            for child in reversed(range(children[node], children[node + 1])):
+                stack.append((child, key + bytes((labels[child],))))
+
+    @property
+    def nodes(self):
+        return self._nodes
+
+    def _find(self, key):
+        """Return ``(node, rank of its first word)`` for a byte prefix, or None."""
+        node = rank = 0
+        children, counts, labels = self._children, self._counts, self._labels
+        for byte in key:
+            rank += self._terminal[node]
+            for child in range(children[node], children[node + 1]):
+                if labels[child] == byte:
+                    node = child
+                    break
+                rank += counts[child]
+            else:
+                return None
+        return node, rank
+
+    def __contains__(self, word):
+        found = self._find(word.encode("utf-8"))
+        return found is not None and bool(self._terminal[found[0]])
+
+    def _word(self, rank):
+        """Return the word at ``rank`` in byte order."""
+        node = 0
+        key = bytearray()
+        children, counts = self._children, self._counts
+        labels, terminal = self._labels, self._terminal
+        while True:
+            if terminal[node]:
+                if rank == 0:
+                    return key.decode("utf-8")
+                rank -= 1
+            for child in range(children[node], children[node + 1]):
+                if rank < counts[child]:
+                    node = child
+                    key.append(labels[child])
+                    break
+                rank -= counts[child]
+
+    def _spans(self, min_length, max_length, prefix):
+        """Return ``(start, end)`` slices of ``ranks`` for the matching words."""
+        last = len(self._offsets) - 1
+        lo = self._offsets[min(max(min_length, 0), last)]
+        hi = self._offsets[min(max(max_length + 1, 0), last)]
+        if not prefix:
+            return [(lo, hi)] if lo < hi else []
+        found = self._find(prefix.encode("utf-8"))
+        if found is None:
+            return []
+        first = found[1]
+        after = first + self._counts[found[0]]
+        spans = []
+        for length in range(max(min_length, 0), min(max_length, self._longest) + 1):
+            start, end = self._offsets[length], self._offsets[length + 1]
+            start = bisect.bisect_left(self._ranks, first, start, end)
+            end = bisect.bisect_left(self._ranks, after, start, end)
+            if start < end:
+                spans.append((start, end))
+        return spans
+
+    def _word_at(self, i):
+        return self._word(self._ranks[i])
+
+    def count(self, max_length, min_length=1, prefix=""):
+        """Return how many words start with ``prefix`` and fit the length range."""
+        return self._total(self._spans(min_length, max_length, prefix))
+
+    def sample(self, k, max_length, min_length=1, prefix=""):
+        """Return up to ``k`` distinct random words with ``prefix`` within the length range."""
+        return self._sample(k, self._spans(min_length, max_length, prefix))
+
+    def choice(self, max_length, min_length=1, prefix=""):
+        """Return one random word with ``prefix`` within the length range.
+
+        Raises IndexError if no word fits, like ``random.choice([])``.
+        """
+        return self._choice(self._spans(min_length, max_length, prefix))
+
+
+def _read_word_file(path):
+    """Return the words in a text file: one per line, ``#`` starts a comment."""
+    with open(path, encoding="utf-8") as f:
+        return [word for word in (line.split("#", 1)[0].strip() for line in f) if word]
+
+
+def load_word_list(path):
+    """Open an external word list for ``get_word``.
+
+    ``path`` is a trie written by ``WordTrie.write`` (see the ``wordlist``
+    subcommand) or a table written by ``DifficultyTable.write`` (see
+    ``difficulty``), either of which is memory-mapped as is, or a text
+    file with one word per line.  Text files are compiled once into the
+    cache dir and memory-mapped on later launches until they change.
+    Each text file has one compiled trie, named after its path, with the
+    file's size and mtime alongside in a JSON stamp; an edit recompiles
+    it in place.
+    """
+    import hashlib
+
+    with open(path, "rb") as f:
+        magic = f.read(len(WordTrie.MAGIC))
+    if magic == WordTrie.MAGIC:
+        return WordTrie(path)
+    if magic == DifficultyTable.MAGIC:
+        return DifficultyTable(path)
+    st = os.stat(path)
+    stamp = [st.st_size, st.st_mtime_ns]
+    name = hashlib.sha256(os.path.abspath(path).encode("utf-8")).hexdigest()[:32]
+    compiled = os.path.join(_cache_dir(), "wordlists", name + ".trie")
+    stamp_name = os.path.join("wordlists", name + ".json")
+    if _load_state(stamp_name) == stamp:
+        try:
+            return WordTrie(compiled)
+        except (OSError, ValueError):
+            pass
+    words = _read_word_file(path)
+    try:
+        WordTrie.write(compiled, words)
+        trie = WordTrie(compiled)
+    except OSError:
+        return WordTrie.build(words)
+    _save_state(stamp_name, stamp)
+    return trie
+
+
+DIFFICULTY_BANDS = ("easy", "medium", "hard")
+
+# Spellings whose letters go unsounded: (prefixes, suffixes, anywhere)
+_SILENT_LETTER_PATTERNS = (
+    ("kn", "gn", "wr", "ps", "pn", "rh", "wh"),
+    ("mb", "mn", "gn", "lm", "stle"),
+    ("gh", "bt", "sci", "sce", "dge", "tch", "alk", "olk", "isl"),
+)
+
+# How much each feature adds to a word's difficulty score (sums to 1)
+_DIFFICULTY_WEIGHTS = {"rarity": 0.45, "doubled": 0.15, "silent": 0.15, "miss_rate": 0.25}
+
+# Append-only log of rounds played: one "word<TAB>missed (0 or 1)" line each
+_HISTORY_LOG = "history.log"
+
+
+def _bigrams(word):
+    padded = f"^{word.lower()}$"
+    return [padded[i:i + 2] for i in range(len(padded) - 1)]
+
+
+def _doubled_letters(word):
+    word = word.lower()
+    return sum(1 for a, b in zip(word, word[1:]) if a == b and a.isalpha())
+
+
+def _silent_letters(word):
+    word = word.lower()
+    prefixes, suffixes, anywhere = _SILENT_LETTER_PATTERNS
+    # No two prefixes (or suffixes) can both match one word
+    count = word.startswith(prefixes) + word.endswith(suffixes)
+    for pattern in anywhere:
+        if pattern in word:
+            count += word.count(pattern)
+    return count
+
+
+def _word_fingerprint(words):
+    import hashlib
+
+    digest = hashlib.sha256()
+    for word in sorted(set(words)):
+        digest.update(word.encode("utf-8") + b"\n")
+    return digest.digest()[:16]
+
+
+def record_attempt(word, correct):
+    """Append one attempt at ``word`` to the miss history log in the cache dir.
+
+    Each attempt is a single short ``O_APPEND`` write, so games running
+    at once never overwrite each other's rounds.  Errors are ignored.
+    """
+    line = f"{word.lower()}\t{int(not correct)}\n".encode("utf-8")
+    try:
+        os.makedirs(_cache_dir(), exist_ok=True)
+        fd = os.open(os.path.join(_cache_dir(), _HISTORY_LOG),
+                     os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
+def _read_history(paths=()):
+    """Return ``{word: [attempts, misses]}`` from the history log plus attempt files.
+
+    Attempt files are CSV or JSONL in the ``grade`` subcommand's input
+    format.  Malformed lines and rows are ignored.
+    """
+    history = {}
+    try:
+        with open(os.path.join(_cache_dir(), _HISTORY_LOG), encoding="utf-8",
+                  errors="replace") as f:
+            for line in f:
+                word, _, missed = line.rstrip("\n").partition("\t")
+                if word and missed in ("0", "1"):
+                    counts = history.setdefault(word, [0, 0])
+                    counts[0] += 1
+                    counts[1] += missed == "1"
+    except OSError:
+        pass
+    for path in paths or ():
+        jsonl = path.endswith((".jsonl", ".ndjson"))
+        reader = _read_jsonl_attempts if jsonl else _read_csv_attempts
+        with open(path, newline="", encoding="utf-8") as f:
+            for _, expected, attempt in reader(f):
+                if expected is None:
+                    continue
+                counts = history.setdefault(expected.strip().lower(), [0, 0])
+                counts[0] += 1
+                counts[1] += not check_spelling(expected, attempt)
+    return history
+
+
+class DifficultyTable(_MappedIndex):
+    """Precomputed difficulty metadata for a word list, banded for sampling.
+
+    Every word gets a score from 0 to 1 mixing how rare its letter
+    bigrams are within the list, its doubled letters, its silent-letter
+    spellings and how often players have missed it.  The list is split
+    into equal thirds by score (the DIFFICULTY_BANDS) and stored grouped
+    by band, then by length, so any band and length range is one
+    contiguous slice and sampling works like WordIndex.  Per-word
+    features are kept as fixed-point arrays in the same order, and a
+    file written by ``write`` is memory-mapped on open.  Layout
+    (little-endian)::
+
+        header    magic b"SBDT", u16 version, u16 reserved, u32 words,
+                  u32 longest, u32 text bytes, 16-byte list fingerprint
+        bounds    (3 x (longest + 1) + 1) x u32, index of the first word
+                  of each (band, length)
+        starts    (words + 1) x u32, byte offset of each word in text
+        scores    words x u16, score x 65535
+        rarity    words x u16, mean bigram surprisal in centibits
+        misses    words x u16, smoothed miss rate x 65535
+        doubled   words x u8, doubled letters
+        silent    words x u8, silent-letter patterns
+        text      the words in UTF-8, back to back
+
+    ``build`` and ``write`` take the words and optionally the miss
+    history, as returned by ``_read_history``.
+    """
+
+    MAGIC = b"SBDT"
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHHIII16s")
+
+    def _attach(self, buf, name):
+        try:
+            magic, version, _, words, longest, text_size, fingerprint = \
+                self._HEADER.unpack_from(buf, 0)
+        except struct.error:
+            magic = version = None
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError(f"{name} is not a version {self.VERSION} difficulty table")
+        self._count, self._longest, self.fingerprint = words, longest, fingerprint
+        sections = self._sections(buf, self._HEADER.size, [
+            ("I", len(DIFFICULTY_BANDS) * (longest + 1) + 1), ("I", words + 1),
+            ("H", words), ("H", words), ("H", words), ("B", words), ("B", words),
+            ("B", text_size),
+        ])
+        (self._bounds, self._starts, self._scores, self._rarity, self._misses,
+         self._doubled, self._silent, self._text) = sections
+        self._positions = None
+
+    @classmethod
+    def _encode(cls, words, history=None):
+        words = list(dict.fromkeys(words))
+        history = history or {}
+        pairs = [_bigrams(word) for word in words]
+        bigram_counts = Counter(pair for word_pairs in pairs for pair in word_pairs)
+        total = sum(bigram_counts.values()) or 1
+        surprisal = {pair: -math.log2(count / total) for pair, count in bigram_counts.items()}
+        rarity = [sum(map(surprisal.__getitem__, word_pairs)) / len(word_pairs)
+                  for word_pairs in pairs]
+        del pairs
+        ranked = sorted(rarity)
+
+        attempts = sum(counts[0] for counts in history.values())
+        prior = sum(counts[1] for counts in history.values()) / attempts if attempts else 0.5
+        weights = _DIFFICULTY_WEIGHTS
+        rows = []
+        for word, bits in zip(words, rarity):
+            tries, misses = history.get(word.lower(), (0, 0))
+            miss_rate = (misses + 2 * prior) / (tries + 2)
+            doubled, silent = _doubled_letters(word), _silent_letters(word)
+            score = (weights["rarity"] * bisect.bisect_left(ranked, bits) / max(len(words) - 1, 1)
+                     + weights["doubled"] * min(doubled, 2) / 2
+                     + weights["silent"] * min(silent, 2) / 2
+                     + weights["miss_rate"] * miss_rate)
+            rows.append((score, word, bits, miss_rate, doubled, silent))
+        rows.sort()
+        bands = len(DIFFICULTY_BANDS)
+        rows = sorted(((i * bands // len(rows), len(row[1])) + row for i, row in enumerate(rows)),
+                      key=lambda row: row[:2])
+
+        longest = max((len(word) for word in words), default=0)
+        bounds = [len(rows)] * (bands * (longest + 1) + 1)
+        for i in reversed(range(len(rows))):
+            band, length = rows[i][:2]
+            bounds[band * (longest + 1) + length] = i
+        for i in reversed(range(len(bounds) - 1)):
+            bounds[i] = min(bounds[i], bounds[i + 1])
+        text = bytearray()
+        starts = [0]
+        for row in rows:
+            text += row[3].encode("utf-8")
+            starts.append(len(text))
+
+        header = cls._HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(rows), longest, len(text),
+                                  _word_fingerprint(words))
+        arrays = [array.array("I", bounds), array.array("I", starts),
+                  array.array("H", (round(row[2] * 65535) for row in rows)),
+                  array.array("H", (min(round(row[4] * 100), 65535) for row in rows)),
+                  array.array("H", (round(row[5] * 65535) for row in rows)),
+                  array.array("B", (min(row[6], 255) for row in rows)),
+                  array.array("B", (min(row[7], 255) for row in rows))]
+        return header + cls._pack(arrays) + bytes(text)
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return map(self._word_at, range(self._count))
+
+    def _word_at(self, i):
+        return str(self._text[self._starts[i]:self._starts[i + 1]], "utf-8")
+
+    def _spans(self, min_length, max_length, band):
+        if band is None:
+            bands = range(len(DIFFICULTY_BANDS))
+        elif band in DIFFICULTY_BANDS:
+            bands = (DIFFICULTY_BANDS.index(band),)
+        else:
+            raise ValueError(f"unknown difficulty band {band!r}; "
+                             f"expected one of {', '.join(DIFFICULTY_BANDS)}")
+        width = self._longest + 1
+        low = min(max(min_length, 0), width)
+        high = min(max(max_length + 1, low), width)
+        spans = []
+        for b in bands:
+            start, end = self._bounds[b * width + low], self._bounds[b * width + high]
+            if start < end:
+                spans.append((start, end))
+        return spans
+
+    def count(self, max_length, min_length=1, band=None):
+        """Return how many words in ``band`` (any band if None) fit the length range."""
+        return self._total(self._spans(min_length, max_length, band))
+
+    def sample(self, k, max_length, min_length=1, band=None):
+        """Return up to ``k`` distinct random words in ``band`` within the length range."""
+        return self._sample(k, self._spans(min_length, max_length, band))
+
+    def choice(self, max_length, min_length=1, band=None):
+        """Return one random word in ``band`` within the length range.
+
+        Raises IndexError if no word fits, like ``random.choice([])``.
+        """
+        return self._choice(self._spans(min_length, max_length, band))
+
+    def features(self, word):
+        """Return the stored difficulty metadata for ``word``, or None if it is not listed."""
+        if self._positions is None:
+            self._positions = {w: i for i, w in enumerate(self)}
+        i = self._positions.get(word)
+        if i is None:
+            return None
+        width = self._longest + 1
+        slot = bisect.bisect_right(self._bounds, i, 0, len(DIFFICULTY_BANDS) * width) - 1
+        return {
+            "band": DIFFICULTY_BANDS[slot // width],
+            "score": self._scores[i] / 65535,
+            "rarity": self._rarity[i] / 100,
+            "doubled": self._doubled[i],
+            "silent": self._silent[i],
+            "miss_rate": self._misses[i] / 65535,
+        }
+
+
+_difficulty_table = None
+
+
+def _difficulty_path():
+    return os.path.join(_cache_dir(), "difficulty.table")
+
+
+def _get_difficulty_table(words=None):
+    """Return a DifficultyTable over ``words`` (WORD_LIST by default).
+
+    ``words`` may already be a table, e.g. one opened with
+    ``load_word_list``.  For WORD_LIST the table precomputed by the
+    ``difficulty`` subcommand is used when it still matches the list;
+    otherwise a table is built in memory from the saved miss history on
+    first use.
+    """
+    global _difficulty_table
+    if isinstance(words, DifficultyTable):
+        return words
+    source = WORD_LIST if words is None else words
+    if _difficulty_table is None or _difficulty_table.source is not source:
+        table = None
+        if words is None:
+            try:
+                table = DifficultyTable(_difficulty_path())
+            except (OSError, ValueError):
+                pass
+            if table is not None and table.fingerprint != _word_fingerprint(WORD_LIST):
+                table.close()
+                table = None
+        if table is None:
+            table = DifficultyTable.build(source, _read_history())
+        table.source = source
+        _difficulty_table = table
+    return _difficulty_table
+
+
 _ESPEAK_LIB_NAMES = (
     "libespeak-ng.so",
     "libespeak-ng.so.1",
@@ -317,11 +1154,177 @@ def _find_espeak_library():
     return None
 
 
+class AudioCache:
+    """Content-addressed cache of rendered speech, bounded by total bytes.
+
+    Each WAV file is named after a hash of (text, rate, voice, backend),
+    so the same utterance is synthesised only once.  Playing a file
+    refreshes its mtime, and once the directory grows past ``max_bytes``
+    the least recently played files are deleted.
+    """
+
+    def __init__(self, directory, max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        # Running estimate of the directory size, so the directory is only
+        # rescanned when the budget may actually have been exceeded
+        self._known_bytes = None
+
+    def path_for(self, text, rate, voice, backend):
+        import hashlib
+
+        key = json.dumps([text, rate, voice, backend], ensure_ascii=False)
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.wav")
+
+    def get(self, text, rate, voice, backend):
+        """Return the cached file for this utterance, or None."""
+        path = self.path_for(text, rate, voice, backend)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def render(self, text, rate, voice, backend, render_fn):
+        """Render the utterance with ``render_fn(tmp_path)`` and cache the result.
+
+        ``render_fn`` must write a WAV file to the path it is given and may
+        raise OSError or CalledProcessError.  Returns the cached path.
+        """
+        path = self.path_for(text, rate, voice, backend)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            render_fn(tmp_path)
+            added = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        if self._known_bytes is not None:
+            self._known_bytes += added
+        if self._known_bytes is None or self._known_bytes > self.max_bytes:
+            self._evict()
+        return path
+
+    def size(self):
+        """Return the total size of cached audio in bytes."""
+        return sum(size for _, size, _ in self._entries())
+
+    def _entries(self):
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".wav"):
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        yield st.st_mtime, st.st_size, entry.path
+        except OSError:
+            return
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._known_bytes = total
+
+
+class _EspeakWorker:
+    """A long-running espeak process that speaks one stdin line at a time.
+
+    Given neither text nor ``-f``/``--stdin``, espeak speaks each line of
+    stdin separately as it arrives (``--stdin`` would make it wait for
+    EOF).  Its command line plays audio synchronously, and with ``-x``
+    it echoes each line's phonemes to stdout once the line has been
+    spoken.  That echo is used to tell when an utterance is done.
+    """
+
+    def __init__(self, cmd, timeout=30.0):
+        self.timeout = timeout
+        self.busy = False
+        self._proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self._output = queue.Queue()
+        threading.Thread(target=self._pump, name="espeak-worker", daemon=True).start()
+
+    def _pump(self):
+        fd = self._proc.stdout.fileno()
+        while True:
+            try:
+                chunk = os.read(fd, 4096)
+            except OSError:
+                chunk = b""
+            if not chunk:
+                self._output.put(None)
+                return
+            self._output.put(chunk)
+
+    def alive(self):
+        return self._proc.poll() is None
+
+    def speak(self, text):
+        """Speak ``text`` and block until espeak reports it has finished.
+
+        Raises OSError if the worker has died and queue.Empty if it does
+        not answer within ``timeout`` seconds.
+        """
+        line = " ".join(text.split())
+        if not line:
+            return
+        self.busy = True
+        try:
+            self._proc.stdin.write(line.encode("utf-8") + b"\n")
+            self._proc.stdin.flush()
+            if self._output.get(timeout=self.timeout) is None:
+                raise BrokenPipeError("espeak worker exited")
+        finally:
+            self.busy = False
+        # Drop the rest of this utterance's echo so it isn't mistaken for the next one
+        while True:
+            try:
+                if self._output.get_nowait() is None:
+                    break
+            except queue.Empty:
+                break
+
+    def kill(self):
+        self._proc.kill()
+
+    def close(self):
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        self._proc.kill()
+        self._proc.wait()
+
+
 class SubprocessTTS:
     """Fallback TTS engine using subprocess commands directly.
 
     Used when pyttsx3's audio backend is unavailable (e.g. no aplay on Termux).
     Provides the same say()/runAndWait() interface as a pyttsx3 engine.
+
+    With ``persistent=True`` espeak is started once and fed utterances
+    over stdin instead of being launched per utterance, which avoids
+    reloading the voice each time on slow devices.  The worker is
+    restarted if it dies; if it cannot be used at all, each utterance
+    falls back to a one-off command.
+
+    Given an ``audio_cache`` and a WAV player, utterances are rendered
+    once with ``espeak -w`` and replayed from the cache afterwards, so
+    hearing a word or sentence again skips synthesis entirely.
     """
 
     _COMMANDS = [
@@ -330,116 +1333,1015 @@ class SubprocessTTS:
         ["termux-tts-speak"],
     ]
 
-    def __init__(self):
+    _STATE_FILE = "tts_backends.json"
+
+    # Blocking WAV players, in order of preference
+    _PLAYERS = [
+        ["aplay", "-q"],
+        ["paplay"],
+        ["play-audio"],
+        ["afplay"],
+        ["play", "-q"],
+    ]
+
+    def __init__(self, persistent=False, audio_cache=None):
         self._word = None
         self._rate = None
         self._voice = None
+        self._persistent = persistent
+        self._worker = None
+        self._worker_unavailable = False
+        self._commands = self._resolve_commands()
+        self._audio_cache = audio_cache
+        self._cannot_render = set()
+        self._player = None
+        self._current = None
+        self._interrupted = False
+        self._lock = threading.Lock()
+        if audio_cache is not None:
+            self._player = next((p for p in self._PLAYERS if shutil.which(p[0])), None)
+
+    @classmethod
+    def _resolve_commands(cls):
+        """Return ``_COMMANDS`` reordered so installed backends come first.
+
+        Discovery runs ``shutil.which`` once and is remembered in a state
+        file, reused while ``PATH`` is unchanged and the binaries found
+        last time still exist.  Backends that weren't found stay at the
+        end of the list so runtime failover can still reach them.
+        """
+        names = [cmd[0] for cmd in cls._COMMANDS]
+        path_env = os.environ.get("PATH", "")
+        state = _load_state(cls._STATE_FILE)
+        if (isinstance(state, dict) and state.get("PATH") == path_env
+                and sorted(state.get("order", [])) == sorted(names)
+                and all(os.path.exists(p) for p in state.get("found", {}).values())):
+            order = state["order"]
+        else:
+            found = {name: shutil.which(name) for name in names}
+            found = {name: path for name, path in found.items() if path}
+            order = [n for n in names if n in found] + [n for n in names if n not in found]
+            _save_state(cls._STATE_FILE, {"PATH": path_env, "found": found, "order": order})
+        return [list(cls._COMMANDS[names.index(name)]) for name in order]
+
+    def _promote(self, base_cmd):
+        """Move a backend that just worked to the front, here and on disk."""
+        self._commands.remove(base_cmd)
+        self._commands.insert(0, base_cmd)
+        state = _load_state(self._STATE_FILE)
+        if isinstance(state, dict):
+            state["order"] = [cmd[0] for cmd in self._commands]
+            _save_state(self._STATE_FILE, state)
 
     def set_voice_params(self, rate=None, voice=None):
         self._rate = rate
         self._voice = voice
+        self.close()
 
     def say(self, word):
         self._word = word
 
+    def _espeak_args(self):
+        args = []
+        if self._rate:
+            args.extend(["-s", str(self._rate)])
+        if self._voice:
+            args.extend(["-v", self._voice])
+        return args
+
+    def _worker_commands(self):
+        for base_cmd in self._commands:
+            if base_cmd[0] in ("espeak-ng", "espeak"):
+                # No text and no --stdin: speak stdin line by line
+                yield base_cmd + ["-x"] + self._espeak_args()
+
+    def _start_worker(self):
+        for cmd in self._worker_commands():
+            try:
+                return _EspeakWorker(cmd)
+            except OSError:
+                continue
+        self._worker_unavailable = True
+        return None
+
+    def _speak_with_worker(self, text):
+        while True:
+            fresh = self._worker is None or not self._worker.alive()
+            if fresh:
+                self.close()
+                self._worker = self._start_worker()
+                if self._worker is None:
+                    return False
+            try:
+                self._worker.speak(text)
+                return True
+            except (OSError, queue.Empty):
+                self.close()
+                if self._interrupted:
+                    return True
+                if fresh:
+                    # A brand-new worker failed too: this espeak can't run in worker mode
+                    self._worker_unavailable = True
+                    return False
+
+    def _render_commands(self):
+        if self._audio_cache is None:
+            return []
+        return [cmd for cmd in self._commands
+                if cmd[0] in ("espeak-ng", "espeak") and cmd[0] not in self._cannot_render]
+
+    def cached_audio(self, text):
+        """Return the cached rendering of ``text`` at the current settings, or None."""
+        for base_cmd in self._render_commands():
+            path = self._audio_cache.get(text, self._rate, self._voice, base_cmd[0])
+            if path:
+                return path
+        return None
+
+    def prerender(self, text):
+        """Render ``text`` into the audio cache without playing it.
+
+        Returns the cached file path, or None if rendering isn't possible.
+        """
+        path = self.cached_audio(text)
+        if path:
+            return path
+        for base_cmd in self._render_commands():
+            key = (text, self._rate, self._voice, base_cmd[0])
+
+            def render(tmp_path, base_cmd=base_cmd):
+                cmd = list(base_cmd) + self._espeak_args() + ["-w", tmp_path, text]
+                subprocess.run(cmd, check=True, capture_output=True)
+
+            try:
+                return self._audio_cache.render(*key, render)
+            except FileNotFoundError:
+                self._cannot_render.add(base_cmd[0])
+            except (OSError, subprocess.CalledProcessError):
+                continue
+        return None
+
+    def _run(self, cmd):
+        """Run a speech command to completion, unless ``stop()`` cuts it short.
+
+        Raises FileNotFoundError or CalledProcessError like
+        ``subprocess.run(cmd, check=True)``.
+        """
+        with self._lock:
+            if self._interrupted:
+                return
+            proc = subprocess.Popen(
+                cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            self._current = proc
+        try:
+            returncode = proc.wait()
+        finally:
+            with self._lock:
+                self._current = None
+        if returncode and not self._interrupted:
+            raise subprocess.CalledProcessError(returncode, cmd)
+
+    def _speak_cached(self, text):
+        path = self.prerender(text)
+        if path is None:
+            return False
+        try:
+            self._run(self._player + [path])
+            return True
+        except (OSError, subprocess.CalledProcessError):
+            return False
+
     def runAndWait(self):
         if self._word is None:
             return
         word = self._word
         self._word = None
-        for base_cmd in self._COMMANDS:
+        self._interrupted = False
+        if self._player is not None and self._speak_cached(word):
+            return
+        if self._persistent and not self._worker_unavailable and self._speak_with_worker(word):
+            return
+        for i, base_cmd in enumerate(self._commands):
+            if self._interrupted:
+                return
             try:
                 cmd = list(base_cmd)
                 if base_cmd[0] in ("espeak-ng", "espeak"):
-                    if self._rate:
-                        cmd.extend(["-s", str(self._rate)])
-                    if self._voice:
-                        cmd.extend(["-v", self._voice])
+                    cmd.extend(self._espeak_args())
                 cmd.append(word)
-                subprocess.run(cmd, check=True, capture_output=True)
-                return
+                self._run(cmd)
             except (FileNotFoundError, subprocess.CalledProcessError):
                 continue
+            if i:
+                self._promote(base_cmd)
+            return
 
+    def stop(self):
+        """Interrupt the utterance being spoken, like pyttsx3's ``stop()``.
 
-_word_cache = {}
+        Safe to call from another thread while ``runAndWait`` is blocked.
+        """
+        with self._lock:
+            self._interrupted = True
+            if self._current is not None:
+                self._current.kill()
+        if self._worker is not None and self._worker.busy:
+            # espeak has no way to abandon a line, so drop the worker;
+            # the next utterance starts a fresh one
+            self._worker.kill()
 
+    def close(self):
+        """Stop the persistent worker, if one is running."""
+        if self._worker is not None:
+            self._worker.close()
+            self._worker = None
 
-def _fetch_word_data(word):
-    """Fetch word data from the Free Dictionary API, with caching.
 
-    Only successful responses are cached.  Failures are *not* cached so
-    that a transient network error during ``get_word`` validation does
-    not permanently prevent definition/sentence retrieval later.
+def _cache_dir():
+    """Return the directory used for on-disk caches.
+
+    Honours ``SPELLING_BEE_CACHE_DIR``, then ``XDG_CACHE_HOME``, and
+    finally falls back to ``~/.cache/spelling-bee``.
     """
-    if word in _word_cache:
-        return _word_cache[word]
+    path = os.environ.get("SPELLING_BEE_CACHE_DIR")
+    if path:
+        return path
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "spelling-bee")
+
+
+def _load_state(name):
+    """Return the JSON document saved with ``_save_state``, or None."""
     try:
-        url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{urllib.parse.quote(word)}"
-        with urllib.request.urlopen(url, timeout=5) as resp:
-            data = json.loads(resp.read())
-        _word_cache[word] = data
-        return data
-    except Exception:
+        with open(os.path.join(_cache_dir(), name), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
         return None
 
 
-def get_definition(word):
-    """Return the first definition for the word, or None."""
-    data = _fetch_word_data(word)
-    if not data:
-        return None
+def _save_state(name, data):
+    """Atomically save ``data`` as JSON in the cache dir; errors are ignored."""
+    path = os.path.join(_cache_dir(), name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
     try:
-        return data[0]["meanings"][0]["definitions"][0]["definition"]
-    except (KeyError, IndexError):
-        return None
+        os.makedirs(_cache_dir(), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
 
 
-_FALLBACK_SENTENCES = {
-    "noun": "Learning about the {word} was very interesting.",
-    "verb": "It is important to {word} in this situation.",
-    "adjective": "Many people considered it to be quite {word}.",
-    "adverb": "She performed {word} during the competition.",
-}
-_DEFAULT_SENTENCE = "Please spell the word {word}."
+class DiskCache:
+    """Persistent key/value cache backed by SQLite.
 
+    Entries expire ``ttl`` seconds after they are written, and once the
+    cache holds more than ``max_entries`` rows the least recently used
+    ones are evicted.  SQLite's WAL journal and busy timeout make it safe
+    for several game processes on the same host to share one file.  Any
+    storage error is swallowed: the cache is an optimisation, never a
+    reason for the game to fail.
+    """
 
-def get_sentence(word):
-    """Return an example sentence for the word.
+    def __init__(self, path, ttl=30 * 24 * 3600, max_entries=5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
 
-    Tries the API first.  If no example exists, constructs a sentence
-    using the word's part of speech so the player always hears the word
-    in context.
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "expires REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed)"
+            )
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """Return the cached value for ``key``, or None if missing or expired."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+        except (OSError, sqlite3.Error, ValueError):
+            return None
+
+    def set(self, key, value):
+        """Store ``value`` (JSON-serialisable) under ``key`` and evict if over size."""
+        now = time.time()
+        try:
+            conn = self._connect()
+            payload = json.dumps(value, separators=(",", ":"))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (key, payload, now + self.ttl, now),
+                )
+                conn.execute("DELETE FROM entries WHERE expires <= ?", (now,))
+                (count,) = conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+                if count > self.max_entries:
+                    conn.execute(
+                        "DELETE FROM entries WHERE key IN ("
+                        "SELECT key FROM entries ORDER BY accessed LIMIT ?)",
+                        (count - self.max_entries,),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except (OSError, sqlite3.Error, TypeError, ValueError):
+            pass
+
+    def __len__(self):
+        try:
+            (count,) = self._connect().execute(
+                "SELECT COUNT(*) FROM entries WHERE expires > ?", (time.time(),)
+            ).fetchone()
+            return count
+        except (OSError, sqlite3.Error):
+            return 0
+
+
+class LRUCache:
+    """Thread-safe mapping that keeps at most ``maxsize`` entries.
+
+    Reading an entry marks it as recently used; inserting past the limit
+    evicts the least recently used entry.
     """
-    data = _fetch_word_data(word)
-    if data:
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def __getitem__(self, key):
+        with self._lock:
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class WordRecord:
+    """The few dictionary fields the game uses, extracted once per word.
+
+    The API response also carries phonetics, synonyms, licences and
+    source URLs; only the first definition, the first example sentence
+    and the first part of speech are kept.
+    """
+
+    __slots__ = ("definition", "example", "part_of_speech")
+
+    def __init__(self, definition=None, example=None, part_of_speech=None):
+        self.definition = definition
+        self.example = example
+        self.part_of_speech = part_of_speech
+
+    def __eq__(self, other):
+        if not isinstance(other, WordRecord):
+            return NotImplemented
+        return (self.definition, self.example, self.part_of_speech) == (
+            other.definition, other.example, other.part_of_speech)
+
+    def __repr__(self):
+        return (f"WordRecord(definition={self.definition!r}, "
+                f"example={self.example!r}, part_of_speech={self.part_of_speech!r})")
+
+    @classmethod
+    def from_api(cls, data):
+        """Build a record from a Free Dictionary API response."""
+        record = cls()
         try:
-            for meaning in data[0]["meanings"]:
-                for defn in meaning["definitions"]:
-                    if "example" in defn:
-                        return defn["example"]
+            record.definition = data[0]["meanings"][0]["definitions"][0]["definition"]
         except (KeyError, IndexError):
             pass
-        # No example in API — build one from the part of speech
         try:
-            pos = data[0]["meanings"][0]["partOfSpeech"]
-            return _FALLBACK_SENTENCES.get(pos, _DEFAULT_SENTENCE).format(word=word)
+            record.example = next(
+                defn["example"]
+                for meaning in data[0]["meanings"]
+                for defn in meaning["definitions"]
+                if "example" in defn
+            )
+        except (KeyError, IndexError, StopIteration):
+            pass
+        try:
+            record.part_of_speech = data[0]["meanings"][0]["partOfSpeech"]
         except (KeyError, IndexError):
             pass
+        return record
+
+
+class NegativeCache:
+    """Remembers failed lookups so they are not retried straight away.
+
+    A word the dictionary does not know (HTTP 404) is remembered for
+    ``missing_ttl`` seconds.  A transient failure (timeout, server error,
+    no network) is remembered for ``base_delay`` seconds, doubling with
+    each consecutive failure up to ``max_delay``.  The base delay outlasts
+    a typical round, so asking for the definition and then the sentence
+    of a word whose lookup just timed out does not wait on it again.
+    """
+
+    def __init__(self, missing_ttl=24 * 3600, base_delay=120.0, max_delay=900.0, maxsize=4096):
+        self.missing_ttl = missing_ttl
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # word -> (retry_at, consecutive transient failures)
+        self._entries = LRUCache(maxsize=maxsize)
+
+    def blocked(self, word):
+        """Return True if ``word`` failed recently and should not be retried yet."""
+        entry = self._entries.get(word)
+        return entry is not None and time.monotonic() < entry[0]
+
+    def record_missing(self, word):
+        self._entries[word] = (time.monotonic() + self.missing_ttl, 0)
+
+    def record_failure(self, word):
+        entry = self._entries.get(word)
+        failures = entry[1] + 1 if entry else 1
+        delay = min(self.base_delay * 2 ** (failures - 1), self.max_delay)
+        self._entries[word] = (time.monotonic() + delay, failures)
+
+    def record_success(self, word):
+        self._entries.pop(word)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class CircuitBreaker:
+    """Stops calling the dictionary API while it keeps failing.
+
+    ``closed``: lookups go to the network as usual.  After
+    ``failure_threshold`` consecutive transient failures the breaker is
+    ``open`` and lookups are short-circuited, so the game falls back to
+    its built-in sentences without waiting on timeouts.  Once
+    ``reset_timeout`` seconds have passed it is ``half-open`` and lets a
+    single probe through: success closes it, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold=3, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._probing or time.monotonic() >= self._opened_at + self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Return True if a request may go to the network now."""
+        with self._lock:
+            state = self._state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class DictionaryAPIError(Exception):
+    """Non-200 response from the dictionary API; ``status`` holds the code."""
+
+    def __init__(self, status, reason=""):
+        super().__init__(f"HTTP {status} {reason}".strip())
+        self.status = status
+
+
+class DictionaryClient:
+    """Free Dictionary API client that reuses keep-alive connections.
+
+    Idle HTTPS connections are kept in a small pool, so bulk validation
+    and prefetching pay the TCP/TLS handshake once per connection rather
+    than once per word.  Each request checks a connection out of the
+    pool, so one client can be shared between threads.  A request that
+    fails on a reused connection because the server dropped it while
+    idle is retried once on a newly opened connection; any other error,
+    including a timeout, is raised straight away.
+    """
+
+    def __init__(self, host="api.dictionaryapi.dev", port=None, timeout=5, max_idle=4,
+                 connection_class=None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.connection_class = connection_class
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def _connect(self):
+        connection_class = self.connection_class
+        if connection_class is None:
+            import http.client
+            connection_class = http.client.HTTPSConnection
+        return connection_class(self.host, self.port, timeout=self.timeout)
+
+    def _checkin(self, conn):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def fetch(self, word):
+        """Return the decoded API response for ``word``.
+
+        Raises DictionaryAPIError for a non-200 status, and OSError or
+        http.client.HTTPException if the request itself fails.
+        """
+        import http.client
+        import urllib.parse
+
+        # What a keep-alive connection the server has since closed fails with
+        stale = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+        path = f"/api/v2/entries/en/{urllib.parse.quote(word)}"
+        conn, reused = self._checkout()
+        while True:
+            try:
+                conn.request("GET", path, headers={"Accept": "application/json"})
+                resp = conn.getresponse()
+                body = resp.read()
+            except stale:
+                conn.close()
+                if not reused:
+                    raise
+                conn, reused = self._connect(), False
+                continue
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+            if resp.will_close:
+                conn.close()
+            else:
+                self._checkin(conn)
+            if resp.status != 200:
+                raise DictionaryAPIError(resp.status, resp.reason)
+            return json.loads(body)
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one.
+
+    The first caller for a key runs the function; callers that arrive
+    while it is still in flight wait for that call and share its result
+    or exception.  ``saved_total`` counts the calls served this way, and
+    ``saved`` counts them per key for the ``max_keys`` most recently
+    coalesced keys, so memory stays flat over large word lists.
+    """
+
+    def __init__(self, max_keys=1024):
+        self.saved = LRUCache(maxsize=max_keys)
+        self.saved_total = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args):
+        """Return ``fn(*args)``, sharing one call among concurrent callers of ``key``."""
+        from concurrent.futures import Future
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.saved[key] = self.saved.get(key, 0) + 1
+                self.saved_total += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class WordBundle:
+    """Read-only bundle of WordRecords, memory-mapped and decoded lazily.
+
+    Written by ``python spelling_bee.py warm`` so machines without
+    internet get full definitions.  Layout (little-endian)::
+
+        header   magic b"SBWB", u16 version, u16 reserved, u32 count
+        offsets  (count + 1) x u32, relative to the start of the data
+        data     per word, sorted: word NUL definition NUL example NUL part_of_speech
+
+    Lookups binary-search the sorted words in place; only the entry that
+    matches is decoded.
+    """
+
+    MAGIC = b"SBWB"
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHHI")
+    _OFFSET = struct.Struct("<I")
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, count = self._HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            magic, version, count = None, None, 0
+        if magic != self.MAGIC or version != self.VERSION:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {self.VERSION} word bundle")
+        self._count = count
+        self._data = self._HEADER.size + self._OFFSET.size * (count + 1)
+
+    def __len__(self):
+        return self._count
+
+    def _span(self, i):
+        pos = self._HEADER.size + self._OFFSET.size * i
+        start = self._data + self._OFFSET.unpack_from(self._mm, pos)[0]
+        end = self._data + self._OFFSET.unpack_from(self._mm, pos + self._OFFSET.size)[0]
+        return start, end
+
+    def _find(self, word):
+        key = word.encode("utf-8")
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            start, end = self._span(mid)
+            current = self._mm[start:self._mm.find(b"\0", start, end)]
+            if current < key:
+                lo = mid + 1
+            elif current > key:
+                hi = mid
+            else:
+                return start, end
+        return None
+
+    def __contains__(self, word):
+        return self._find(word) is not None
+
+    def get(self, word):
+        """Return the WordRecord for ``word``, or None if it is not bundled."""
+        span = self._find(word)
+        if span is None:
+            return None
+        fields = self._mm[span[0]:span[1]].decode("utf-8").split("\0")
+        return WordRecord(*(field or None for field in fields[1:]))
+
+    def close(self):
+        self._mm.close()
+
+    @classmethod
+    def write(cls, path, records):
+        """Write ``records`` (a mapping of word to WordRecord) to ``path``."""
+        offsets = [0]
+        chunks = []
+        for word in sorted(records, key=lambda w: w.encode("utf-8")):
+            record = records[word]
+            fields = (word, record.definition, record.example, record.part_of_speech)
+            chunk = "\0".join((field or "").replace("\0", "") for field in fields).encode("utf-8")
+            chunks.append(chunk)
+            offsets.append(offsets[-1] + len(chunk))
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(cls._HEADER.pack(cls.MAGIC, cls.VERSION, 0, len(chunks)))
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            f.writelines(chunks)
+        os.replace(tmp_path, path)
+
+
+_word_cache = LRUCache(maxsize=1024)
+_negative_cache = NegativeCache()
+_dictionary_breaker = CircuitBreaker()
+_dictionary_client = DictionaryClient()
+_word_lookups = SingleFlight()
+
+
+def dictionary_status():
+    """Return the dictionary circuit state: "closed", "open" or "half-open".
+
+    Anything other than "closed" means the game is running degraded, on
+    cached data and built-in fallback sentences.
+    """
+    return _dictionary_breaker.state
+
+
+_disk_cache = None
+
+
+def _get_disk_cache():
+    """Return the shared on-disk dictionary cache, creating it on first use."""
+    global _disk_cache
+    if _disk_cache is None:
+        _disk_cache = DiskCache(
+            os.path.join(_cache_dir(), "dictionary.sqlite3"),
+            ttl=float(os.environ.get("SPELLING_BEE_CACHE_TTL", 30 * 24 * 3600)),
+            max_entries=int(os.environ.get("SPELLING_BEE_CACHE_SIZE", 5000)),
+        )
+    return _disk_cache
+
+
+def _get_audio_cache():
+    """Return the on-disk cache of rendered speech."""
+    return AudioCache(
+        os.path.join(_cache_dir(), "audio"),
+        max_bytes=int(os.environ.get("SPELLING_BEE_AUDIO_CACHE_BYTES", 512 * 1024 * 1024)),
+    )
+
+
+_word_bundle = None
+
+
+def _bundle_path():
+    return os.environ.get("SPELLING_BEE_BUNDLE") or os.path.join(_cache_dir(), "words.bundle")
+
+
+def _get_word_bundle():
+    """Return the offline WordBundle, or None if there isn't a usable one."""
+    global _word_bundle
+    if _word_bundle is None:
+        try:
+            _word_bundle = WordBundle(_bundle_path())
+        except (OSError, ValueError):
+            _word_bundle = False
+    return _word_bundle or None
+
+
+def _fetch_word_data(word):
+    """Fetch raw word data from the Free Dictionary API.
+
+    The persistent on-disk cache is consulted before the network.  Only
+    successful responses are stored there.  Failures go to the separate
+    ``_negative_cache`` instead: words the API does not know are skipped
+    for a long time, while transient errors are retried with exponential
+    backoff, so a dead lookup never costs the full timeout twice in a row
+    but a flaky network does not permanently hide a word either.
+    """
+    disk_cache = _get_disk_cache()
+    data = disk_cache.get(word)
+    if data is not None:
+        return data
+    if _negative_cache.blocked(word) or not _dictionary_breaker.allow():
+        return None
+    try:
+        data = _dictionary_client.fetch(word)
+    except DictionaryAPIError as e:
+        if e.status == 404:
+            # The API answered, it just doesn't know the word
+            _dictionary_breaker.record_success()
+            _negative_cache.record_missing(word)
+        else:
+            _dictionary_breaker.record_failure()
+            _negative_cache.record_failure(word)
+        return None
+    except Exception:
+        _dictionary_breaker.record_failure()
+        _negative_cache.record_failure(word)
+        return None
+    _dictionary_breaker.record_success()
+    _negative_cache.record_success(word)
+    disk_cache.set(word, data)
+    return data
+
+
+def _get_word_record(word):
+    """Return the cached WordRecord for ``word``, fetching it if needed.
+
+    Records live in a bounded LRU so memory stays flat however many
+    words a long-running session sees.  Misses are served from the
+    offline bundle when one is installed, then from the network via
+    ``_fetch_word_data``.  Concurrent callers for the same
+    word (prefetch, validation, the menu) share a single lookup.
+    Returns None on fetch failure.
+    """
+    record = _word_cache.get(word)
+    if record is not None:
+        return record
+    bundle = _get_word_bundle()
+    if bundle is not None:
+        record = bundle.get(word)
+        if record is not None:
+            _word_cache[word] = record
+            return record
+    return _word_lookups.do(word, _load_word_record, word)
+
+
+def _load_word_record(word):
+    # A lookup that finished between our cache check and joining the flight
+    record = _word_cache.get(word)
+    if record is not None:
+        return record
+    data = _fetch_word_data(word)
+    if not data:
+        return None
+    record = WordRecord.from_api(data)
+    _word_cache[word] = record
+    return record
+
+
+def get_definition(word):
+    """Return the first definition for the word, or None."""
+    record = _get_word_record(word)
+    return record.definition if record else None
+
+
+_FALLBACK_SENTENCES = {
+    "noun": "Learning about the {word} was very interesting.",
+    "verb": "It is important to {word} in this situation.",
+    "adjective": "Many people considered it to be quite {word}.",
+    "adverb": "She performed {word} during the competition.",
+}
+_DEFAULT_SENTENCE = "Please spell the word {word}."
+
+
+def get_sentence(word):
+    """Return an example sentence for the word.
+
+    Tries the API first.  If no example exists, constructs a sentence
+    using the word's part of speech so the player always hears the word
+    in context.
+    """
+    record = _get_word_record(word)
+    if record:
+        if record.example is not None:
+            return record.example
+        # No example in API — build one from the part of speech
+        if record.part_of_speech:
+            return _FALLBACK_SENTENCES.get(record.part_of_speech, _DEFAULT_SENTENCE).format(word=word)
     return _DEFAULT_SENTENCE.format(word=word)
 
 
+_ENGINE_STATE = "tts_engine.json"
+
+
+def _tts_fingerprint():
+    """Describe the environment the TTS engine choice depends on."""
+    return [sys.platform, sys.executable, os.environ.get("PATH", ""), shutil.which("aplay")]
+
+
+def _load_engine_state():
+    """Return the saved engine resolution if it matches this environment."""
+    state = _load_state(_ENGINE_STATE)
+    if isinstance(state, dict) and state.get("fingerprint") == _tts_fingerprint():
+        return state
+    return None
+
+
+def _save_engine_state(**fields):
+    state = _load_engine_state() or {"fingerprint": _tts_fingerprint()}
+    state.update(fields)
+    _save_state(_ENGINE_STATE, state)
+
+
 def configure_voice(engine):
-    """Configure TTS engine for a slower, friendlier female voice."""
+    """Configure TTS engine for a slower, friendlier female voice.
+
+    Finding a female pyttsx3 voice means enumerating every installed
+    voice, so the chosen voice id is remembered alongside the engine
+    resolution and reused on later launches.  A remembered voice that
+    has since been uninstalled is looked up again.
+    """
     if isinstance(engine, SubprocessTTS):
         engine.set_voice_params(rate=130, voice="en+f3")
         return
     engine.setProperty("rate", 130)
+    state = _load_engine_state()
+    if state is not None and "voice_id" in state:
+        if state["voice_id"] is None:
+            return
+        try:
+            engine.setProperty("voice", state["voice_id"])
+            return
+        except Exception:
+            pass
+    voice_id = None
     voices = engine.getProperty("voices")
     for voice in voices:
         if getattr(voice, "gender", None) == "Female":
-            engine.setProperty("voice", voice.id)
-            return
+            voice_id = voice.id
+            engine.setProperty("voice", voice_id)
+            break
+    _save_engine_state(voice_id=voice_id)
+
+
+def _init_pyttsx3_with_library(lib_path):
+    """Initialise pyttsx3 with its espeak driver loading ``lib_path``."""
+    import ctypes
+
+    # Remove cached failed imports so pyttsx3 retries the driver load
+    for mod_name in list(sys.modules):
+        if "pyttsx3.drivers" in mod_name:
+            del sys.modules[mod_name]
+
+    # Temporarily patch ctypes.cdll.LoadLibrary so pyttsx3's espeak
+    # driver can find the library at the non-standard path
+    original_load = ctypes.cdll.LoadLibrary
+
+    def _patched_load(name):
+        try:
+            return original_load(name)
+        except OSError:
+            if "espeak" in str(name).lower():
+                return original_load(lib_path)
+            raise
+
+    ctypes.cdll.LoadLibrary = _patched_load
+    try:
+        return pyttsx3.init()
+    finally:
+        ctypes.cdll.LoadLibrary = original_load
 
 
 def init_tts_engine():
@@ -448,55 +2350,361 @@ def init_tts_engine():
     On Linux, pyttsx3's espeak driver plays audio via aplay (ALSA).
     If aplay is not available (e.g. Termux on Android), returns a
     SubprocessTTS that calls espeak-ng/espeak/termux-tts-speak directly.
+
+    The outcome (backend and espeak library path) is saved and reused on
+    the next launch while the platform, interpreter and ``PATH`` are
+    unchanged, skipping the failed first ``pyttsx3.init()`` and the
+    library search.  If the saved choice no longer works, the full
+    resolution runs again.
     """
+    state = _load_engine_state()
+    if state is not None:
+        try:
+            if state.get("backend") == "subprocess":
+                return SubprocessTTS(persistent=True, audio_cache=_get_audio_cache())
+            if state.get("backend") == "pyttsx3":
+                return pyttsx3.init()
+            if state.get("backend") == "pyttsx3-library" and os.path.isfile(state.get("lib_path", "")):
+                return _init_pyttsx3_with_library(state["lib_path"])
+        except Exception:
+            pass
+
     # pyttsx3's espeak driver hardcodes os.system("aplay ...") for Linux
     # playback. If aplay is missing, audio silently fails, so skip pyttsx3
     # entirely and use SubprocessTTS which calls TTS commands directly.
     if sys.platform.startswith("linux") and not shutil.which("aplay"):
-        return SubprocessTTS()
+        _save_state(_ENGINE_STATE, {"fingerprint": _tts_fingerprint(), "backend": "subprocess"})
+        return SubprocessTTS(persistent=True, audio_cache=_get_audio_cache())
 
     try:
-        return pyttsx3.init()
+        engine = pyttsx3.init()
+        _save_state(_ENGINE_STATE, {"fingerprint": _tts_fingerprint(), "backend": "pyttsx3"})
+        return engine
     except Exception as original_error:
         lib_path = _find_espeak_library()
         if lib_path is None:
             raise original_error
+        engine = _init_pyttsx3_with_library(lib_path)
+        _save_state(_ENGINE_STATE, {"fingerprint": _tts_fingerprint(),
+                                    "backend": "pyttsx3-library", "lib_path": lib_path})
+        return engine
+
 
-        import ctypes
+class LoopingEngine:
+    """Keeps a pyttsx3 driver loop running on one persistent thread.
 
-        # Remove cached failed imports so pyttsx3 retries the driver load
-        for mod_name in list(sys.modules):
-            if "pyttsx3.drivers" in mod_name:
-                del sys.modules[mod_name]
+    pyttsx3's ``runAndWait`` starts and tears down the driver loop for
+    every utterance.  Here the loop is started once with
+    ``startLoop(False)`` and pumped with ``iterate()``, and ``say`` /
+    ``runAndWait`` feed it text and wait for pyttsx3's
+    ``finished-utterance`` notification.  All calls into the pyttsx3
+    engine happen on the loop thread.  Functions registered with
+    ``on_finished`` are called as ``callback(text, completed)`` after each
+    utterance.
+    """
 
-        # Temporarily patch ctypes.cdll.LoadLibrary so pyttsx3's espeak
-        # driver can find the library at the non-standard path
-        original_load = ctypes.cdll.LoadLibrary
+    _STOP = object()
+
+    def __init__(self, engine, interval=0.01, timeout=60.0):
+        self.engine = engine
+        self.interval = interval
+        self.timeout = timeout
+        self._pending = []
+        self._callbacks = []
+        self._commands = queue.Queue()
+        self._waiting = {}
+        self._texts = {}
+        self._counter = 0
+        self._broken = False
+        self._lock = threading.Lock()
+        engine.connect("finished-utterance", self._on_finished)
+        self._thread = threading.Thread(target=self._loop, name="pyttsx3-loop", daemon=True)
+        self._thread.start()
+
+    def on_finished(self, callback):
+        self._callbacks.append(callback)
+
+    def say(self, text):
+        self._pending.append(text)
+
+    def runAndWait(self):
+        batch, self._pending = self._pending, []
+        commands = []
+        with self._lock:
+            # Checked under the lock: the loop thread sets _broken before
+            # stop() takes it, so waiters registered here are always released.
+            broken = self._broken or not self._thread.is_alive()
+            if not broken:
+                for text in batch:
+                    self._counter += 1
+                    name = f"utterance-{self._counter}"
+                    self._waiting[name] = threading.Event()
+                    self._texts[name] = text
+                    commands.append(("say", text, name))
+                events = [self._waiting[command[2]] for command in commands]
+        if broken:
+            for text in batch:
+                self.engine.say(text)
+            self.engine.runAndWait()
+            return
+        for command in commands:
+            self._commands.put(command)
+        for event in events:
+            event.wait(self.timeout)
 
-        def _patched_load(name):
+    def stop(self):
+        """Interrupt the current utterance and release anyone waiting on it."""
+        self._commands.put(("stop",))
+        with self._lock:
+            waiting, self._waiting = self._waiting, {}
+            self._texts.clear()
+        for event in waiting.values():
+            event.set()
+
+    def _on_finished(self, name, completed):
+        with self._lock:
+            event = self._waiting.pop(name, None)
+            text = self._texts.pop(name, None)
+        for callback in self._callbacks:
             try:
-                return original_load(name)
-            except OSError:
-                if "espeak" in str(name).lower():
-                    return original_load(lib_path)
-                raise
+                callback(text, completed)
+            except Exception:
+                pass
+        if event is not None:
+            event.set()
 
-        ctypes.cdll.LoadLibrary = _patched_load
+    def _loop(self):
         try:
-            return pyttsx3.init()
+            self.engine.startLoop(False)
+        except Exception:
+            # This driver can't run an external loop; fall back to runAndWait
+            self._broken = True
+            self.stop()
+            return
+        try:
+            self._pump()
+        except Exception:
+            # The driver failed mid-loop; release waiters and fall back
+            self._broken = True
+            self.stop()
         finally:
-            ctypes.cdll.LoadLibrary = original_load
+            try:
+                self.engine.endLoop()
+            except Exception:
+                pass
 
+    def _pump(self):
+        while True:
+            try:
+                command = self._commands.get(timeout=self.interval)
+            except queue.Empty:
+                command = None
+            if command is self._STOP:
+                return
+            if command is not None:
+                if command[0] == "say":
+                    self.engine.say(command[1], command[2])
+                else:
+                    self.engine.stop()
+            self.engine.iterate()
 
-def get_word(max_length=8):
-    """Pick a random word guaranteed to have a definition and sentence."""
-    candidates = [w for w in WORD_LIST if len(w) <= max_length]
-    random.shuffle(candidates)
-    for word in candidates[:15]:
-        if get_definition(word):
-            return word
+    def close(self):
+        self.stop()
+        self._commands.put(self._STOP)
+        self._thread.join(timeout=2)
+
+
+class SpeechService:
+    """Speaks on a background thread so the menu never waits for audio.
+
+    Wraps any engine with the pyttsx3 ``say``/``runAndWait`` interface
+    (pyttsx3 itself or SubprocessTTS) and offers the same interface, so
+    ``speak_word`` works unchanged: ``say`` collects text and
+    ``runAndWait`` hands it to the speech thread and returns at once.
+    New speech interrupts whatever is still playing.  ``wait`` blocks
+    until everything queued has been spoken.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._pending = []
+        self._queue = queue.Queue()
+        self._outstanding = 0
+        self._idle = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="speech", daemon=True)
+        self._thread.start()
+
+    def say(self, text):
+        self._pending.append(text)
+
+    def runAndWait(self):
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.cancel()
+        with self._idle:
+            self._outstanding += 1
+        self._queue.put(batch)
+
+    def cancel(self):
+        """Drop queued speech and interrupt the current utterance."""
+        dropped = 0
+        while True:
+            try:
+                if self._queue.get_nowait() is not None:
+                    dropped += 1
+            except queue.Empty:
+                break
+        if dropped:
+            self._finished(dropped)
+        with self._idle:
+            speaking = self._outstanding > 0
+        stop = getattr(self.engine, "stop", None)
+        if speaking and stop is not None:
+            try:
+                stop()
+            except Exception:
+                pass
+
+    def prerender(self, text):
+        """Render ``text`` ahead of time if the engine can; return its path or None."""
+        prerender = getattr(self.engine, "prerender", None)
+        return prerender(text) if prerender is not None else None
+
+    def wait(self, timeout=None):
+        """Block until all queued speech has finished; return False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._outstanding == 0, timeout)
+
+    def _finished(self, count=1):
+        with self._idle:
+            self._outstanding -= count
+            self._idle.notify_all()
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            try:
+                for text in batch:
+                    self.engine.say(text)
+                self.engine.runAndWait()
+            except Exception:
+                pass
+            finally:
+                self._finished()
+
+    def close(self):
+        """Interrupt any speech, stop the speech thread and close the engine."""
+        self.cancel()
+        self._queue.put(None)
+        self._thread.join(timeout=2)
+        close = getattr(self.engine, "close", None)
+        if close is not None:
+            close()
+
+
+def get_word(max_length=8, workers=5, budget=8.0, words=None, difficulty=None):
+    """Pick a random word guaranteed to have a definition and sentence.
+
+    Up to 15 candidates are validated concurrently on ``workers`` threads
+    and the first one found to have a definition is returned.  If none
+    validates within ``budget`` seconds, a word is returned without full
+    validation.  Lookups still running at that point are left to finish
+    in the background so that their results still reach the cache.
+    Words come from ``words`` (a WordIndex, WordTrie or DifficultyTable,
+    such as one from ``load_word_list``), or from WORD_LIST by default.
+    ``difficulty`` limits them to one of the DIFFICULTY_BANDS.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    if difficulty is None:
+        index = words if words is not None else _get_word_index()
+        band = {}
+    else:
+        index = _get_difficulty_table(words)
+        band = {"band": difficulty}
+    if dictionary_status() == CircuitBreaker.OPEN:
+        # Offline: validation would only fail, so skip straight to a word
+        return index.choice(max_length, **band)
+    to_check = index.sample(15, max_length, **band)
+    deadline = time.monotonic() + budget
+    executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="get_word")
+    try:
+        pending = {executor.submit(get_definition, word): word for word in to_check}
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            # Prefer the earliest candidate when several finish together
+            for future in sorted(done, key=lambda f: to_check.index(pending[f])):
+                word = pending.pop(future)
+                if future.result():
+                    return word
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
     # Fallback: return a word even without full API validation
-    return random.choice(candidates)
+    return index.choice(max_length, **band)
+
+
+class WordPrefetcher:
+    """Keep up to ``depth`` validated words ready ahead of the player.
+
+    A background thread picks words with ``get_word`` and looks up their
+    definition and sentence, so the data is already cached when the round
+    starts.  ``hits`` counts words served straight from the queue and
+    ``misses`` counts how often the queue had run dry.
+    """
+
+    def __init__(self, depth=2, max_length=8, words=None, difficulty=None):
+        self.depth = max(1, depth)
+        self.max_length = max_length
+        self.words = words
+        self.difficulty = difficulty
+        self.hits = 0
+        self.misses = 0
+        self._queue = queue.Queue(maxsize=self.depth)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            word = get_word(self.max_length, words=self.words, difficulty=self.difficulty)
+            get_definition(word)
+            get_sentence(word)
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(word, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+    def next_word(self, timeout=10.0):
+        """Return the next prefetched word, waiting for one if necessary."""
+        try:
+            word = self._queue.get_nowait()
+            self.hits += 1
+            return word
+        except queue.Empty:
+            self.misses += 1
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                return self._queue.get(timeout=timeout)
+            except queue.Empty:
+                pass
+        return get_word(self.max_length, words=self.words, difficulty=self.difficulty)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
 
 
 def check_spelling(correct, attempt):
@@ -514,6 +2722,96 @@ def compare(correct, attempt):
     return matches, accuracy
 
 
+# Alignment marks, as in CIGAR strings: the attempt has the expected letter,
+# a different letter, an extra letter, or is missing the expected letter
+MATCH, SUBSTITUTE, INSERT, DELETE = "=", "X", "I", "D"
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+def _edit_columns(expected, attempt):
+    """Yield the Myers/Hyyrö bit-parallel edit distance columns.
+
+    ``expected`` runs down the rows and ``attempt`` along the columns.
+    For each letter of ``attempt`` this yields ``(pv, mv)``: bit ``i`` is
+    set in ``pv`` (``mv``) when ``D[i + 1][j]`` is one more (one less)
+    than ``D[i][j]``.  Each column costs a handful of integer operations
+    however long ``expected`` is.  Letters compare case-insensitively,
+    one at a time, like ``compare``.
+    """
+    peq = {}
+    for i, ch in enumerate(expected):
+        ch = ch.lower()
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << len(expected)) - 1
+    pv, mv = mask, 0
+    for ch in attempt:
+        eq = peq.get(ch.lower(), 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        ph = (ph << 1) | 1  # the top row, D[0][j] = j, always steps up
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+        yield pv, mv
+
+
+def edit_distance(expected, attempt):
+    """Return the Levenshtein distance between the words, ignoring case."""
+    pv, mv = (1 << len(expected)) - 1, 0
+    for pv, mv in _edit_columns(expected, attempt):
+        pass
+    # D[m][n] is D[0][n] = n plus the vertical deltas down the last column
+    return len(attempt) + _popcount(pv) - _popcount(mv)
+
+
+def align(correct, attempt):
+    """Align the attempt to the correct word by edit distance.
+
+    An alternative to ``compare`` that isn't thrown off by a missing or
+    extra letter: ``align("giraffe", "jirafe")`` finds one wrong and one
+    missing letter rather than scoring everything after the ``j`` as
+    wrong.  Returns ``(marks, accuracy)``, where marks is a list of
+    ``(op, correct_letter, attempt_letter)`` with op one of MATCH,
+    SUBSTITUTE, INSERT (no correct letter) or DELETE (no attempt letter),
+    and accuracy is ``100 * (1 - distance / longer length)``.
+    """
+    columns = [((1 << len(correct)) - 1, 0)]
+    columns.extend(_edit_columns(correct, attempt))
+
+    def cell(i, j):
+        pv, mv = columns[j]
+        low = (1 << i) - 1
+        return j + _popcount(pv & low) - _popcount(mv & low)
+
+    i, j = len(correct), len(attempt)
+    distance = here = cell(i, j)
+    if distance == 0:
+        return [(MATCH, ch, got) for ch, got in zip(correct, attempt)], 100.0
+    marks = []
+    while i or j:
+        if i and j:
+            same = correct[i - 1].lower() == attempt[j - 1].lower()
+            diagonal = cell(i - 1, j - 1)
+            if diagonal + (not same) == here:
+                marks.append((MATCH if same else SUBSTITUTE, correct[i - 1], attempt[j - 1]))
+                i, j, here = i - 1, j - 1, diagonal
+                continue
+        if i and cell(i - 1, j) + 1 == here:
+            marks.append((DELETE, correct[i - 1], None))
+            i, here = i - 1, here - 1
+        else:
+            marks.append((INSERT, None, attempt[j - 1]))
+            j, here = j - 1, here - 1
+    marks.reverse()
+    accuracy = (1 - distance / max(len(correct), len(attempt))) * 100
+    return marks, accuracy
+
+
 def speak_word(word, engine):
     engine.say(word)
     engine.runAndWait()
@@ -527,19 +2825,90 @@ def format_success():
     )
 
 
+def _letter(ch, right):
+    if right:
+        return f"{Fore.GREEN}{ch}{Style.RESET_ALL}"
+    return f"{Fore.RED}{Style.BRIGHT}{ch}{Style.RESET_ALL}"
+
+
 def format_failure(correct, matches, accuracy):
+    """Show the correct spelling with wrong letters highlighted.
+
+    ``matches`` is either ``compare``'s per-letter booleans or ``align``'s
+    marks.  Marks also get the attempt lined up underneath, with ``_``
+    for each missing letter and a gap in the word above each extra one.
+    """
     header = f"{Fore.RED}\u274c Unlucky! The correct spelling is:{Style.RESET_ALL}\n"
-    word_display = ""
-    for i, ch in enumerate(correct):
-        if matches[i]:
-            word_display += f"{Fore.GREEN}{ch}{Style.RESET_ALL}"
-        else:
-            word_display += f"{Fore.RED}{Style.BRIGHT}{ch}{Style.RESET_ALL}"
+    if matches and isinstance(matches[0], tuple):
+        word_display = "".join(" " if op == INSERT else _letter(expected, op == MATCH)
+                               for op, expected, _ in matches)
+        word_display += "\n" + "".join(_letter("_" if op == DELETE else got, op == MATCH)
+                                       for op, _, got in matches)
+        word_display += "  (your spelling)"
+    else:
+        word_display = "".join(_letter(ch, matches[i]) for i, ch in enumerate(correct))
     accuracy_line = f"\n{Fore.RED}Accuracy: {accuracy:.0f}%{Style.RESET_ALL}"
     return header + word_display + accuracy_line
 
 
-def play_round(word, engine):
+def _speculate(word, engine):
+    """Start loading ``word``'s data in the background as its round begins.
+
+    The menu's definition and sentence lookups then join this in-flight
+    fetch, or hit the cache it fills, instead of waiting on the network.
+    Engines that can pre-render also get the sentence audio ready, so
+    hearing it plays straight from the audio cache.  Returns the thread.
+    """
+    def run():
+        try:
+            sentence = get_sentence(word)
+            prerender = getattr(engine, "prerender", None)
+            if prerender is not None:
+                prerender(sentence)
+        except Exception:
+            pass  # Speculation must never break the round
+
+    thread = threading.Thread(target=run, name=f"speculate-{word}", daemon=True)
+    thread.start()
+    return thread
+
+
+def format_near_words(correct, attempt, words=None):
+    """Point out real words the attempt spelled or nearly spelled, or return "".
+
+    Words come from ``words``, the list being played (WORD_LIST by default).
+    """
+    attempt = attempt.strip().lower()
+    if not attempt:
+        return ""
+    near = [word for word, _ in _get_near_words(words).lookup(attempt, max_distance=1, limit=4)
+            if word != correct.lower()]
+    if near and near[0] == attempt:
+        return f"{Fore.YELLOW}'{attempt}' is a real word too, just not this one.{Style.RESET_ALL}"
+    if near:
+        return f"{Fore.YELLOW}Close real words: {', '.join(near[:3])}{Style.RESET_ALL}"
+    return ""
+
+
+_SCORING_MODES = ("positional", "alignment")
+
+
+def _scoring_mode():
+    """Return how failed attempts are scored: "positional" (compare) or "alignment".
+
+    Reads ``SPELLING_BEE_SCORING``, ignoring case; raises ValueError for
+    any other value.
+    """
+    value = os.environ.get("SPELLING_BEE_SCORING", "")
+    mode = value.strip().lower() or "positional"
+    if mode not in _SCORING_MODES:
+        raise ValueError(f"SPELLING_BEE_SCORING must be one of {', '.join(_SCORING_MODES)}, "
+                         f"not {value!r}")
+    return mode
+
+
+def play_round(word, engine, words=None):
+    _speculate(word, engine)
     speak_word(word, engine)
     while True:
         print("\n1. Hear the word again")
@@ -562,14 +2931,430 @@ def play_round(word, engine):
         elif choice == "4":
             break
     attempt = input("Type your spelling: ")
-    if check_spelling(word, attempt):
+    correct = check_spelling(word, attempt)
+    record_attempt(word, correct)
+    if correct:
         print(format_success())
     else:
-        matches, accuracy = compare(word, attempt.strip())
+        score = align if _scoring_mode() == "alignment" else compare
+        matches, accuracy = score(word, attempt.strip())
         print(format_failure(word, matches, accuracy))
+        near = format_near_words(word, attempt, words)
+        if near:
+            print(near)
+
+
+# Responses worth retrying during a bulk warm: rate limiting and server errors
+_WARM_RETRY_STATUSES = (429, 500, 502, 503, 504)
+_WARM_MAX_WORKERS = 8
+
+
+def _warm_fetch(word, attempts=4, base_delay=1.0):
+    """Return the WordRecord for ``word`` for warm_cache, or None.
+
+    Checks the disk cache, then calls the client directly.  The circuit
+    breaker and negative cache exist to keep interactive play responsive;
+    during a bulk warm they would turn a short burst of errors into
+    instant failures for every remaining word.  Rate limiting, server
+    errors and network errors are retried with jittered exponential
+    backoff instead, while a 404 is final.
+    """
+    import http.client
+
+    disk_cache = _get_disk_cache()
+    data = disk_cache.get(word)
+    if data is None:
+        for attempt in range(attempts):
+            try:
+                data = _dictionary_client.fetch(word)
+                break
+            except DictionaryAPIError as e:
+                if e.status not in _WARM_RETRY_STATUSES:
+                    return None
+            except (OSError, http.client.HTTPException, ValueError):
+                pass
+            if attempt + 1 < attempts:
+                time.sleep(base_delay * 2 ** attempt * random.uniform(0.5, 1.0))
+        else:
+            return None
+        disk_cache.set(word, data)
+    return WordRecord.from_api(data) if data else None
+
+
+def warm_cache(words, bundle_path, workers=4, base_delay=1.0, min_fetched=0.5):
+    """Fetch every word concurrently and write an offline bundle.
+
+    At most ``_WARM_MAX_WORKERS`` lookups run at once, each retried with
+    backoff by ``_warm_fetch``.  Reports the words that lack a definition
+    or an example sentence, and the ones that could not be fetched at
+    all (those are left out of the bundle).  If fewer than
+    ``min_fetched`` of the words were fetched, the API was most likely
+    unreachable, so no bundle is written and any existing one is kept.
+    Returns the number of words that could not be fetched.
+    """
+    global _word_bundle
+    from concurrent.futures import ThreadPoolExecutor
+
+    start = time.perf_counter()
+    workers = max(1, min(workers, _WARM_MAX_WORKERS))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warm") as pool:
+        records = dict(zip(words, pool.map(
+            lambda word: _warm_fetch(word, base_delay=base_delay), words)))
+    elapsed = time.perf_counter() - start
+    bundled = {word: record for word, record in records.items() if record is not None}
+    failed = sorted(word for word, record in records.items() if record is None)
+    no_definition = sorted(word for word, record in bundled.items() if not record.definition)
+    no_example = sorted(word for word, record in bundled.items() if not record.example)
+    print(f"Fetched {len(bundled)}/{len(records)} words in {elapsed:.1f}s")
+    if len(bundled) < min_fetched * len(records):
+        print(f"{Fore.RED}Too few words could be fetched; not writing {bundle_path}. "
+              f"Check the connection and run warm again.{Style.RESET_ALL}")
+        return len(failed)
+    WordBundle.write(bundle_path, bundled)
+    _word_bundle = None
+    for label, missing in (("Could not fetch", failed),
+                           ("Missing definition", no_definition),
+                           ("Missing example", no_example)):
+        if missing:
+            print(f"{Fore.YELLOW}{label} ({len(missing)}): {', '.join(missing)}{Style.RESET_ALL}")
+    print(f"Wrote {len(bundled)} words to {bundle_path} ({os.path.getsize(bundle_path)} bytes)")
+    return len(failed)
+
+
+def _cached_record(word):
+    """Return the WordRecord for ``word`` if it is available without the network."""
+    record = _word_cache.get(word)
+    if record is None:
+        bundle = _get_word_bundle()
+        record = bundle.get(word) if bundle is not None else None
+    if record is None:
+        data = _get_disk_cache().get(word)
+        record = WordRecord.from_api(data) if data else None
+    return record
+
+
+_render_tts = None
+
+
+def _init_render_worker(max_bytes):
+    global _render_tts
+    _render_tts = SubprocessTTS(audio_cache=AudioCache(
+        os.path.join(_cache_dir(), "audio"), max_bytes=max_bytes))
+    configure_voice(_render_tts)
+
+
+def _render_utterance(text):
+    """Return ``(status, bytes of audio)`` for one utterance."""
+    path = _render_tts.cached_audio(text)
+    status = "cached"
+    if not path:
+        path = _render_tts.prerender(text)
+        status = "rendered" if path else "failed"
+    try:
+        return status, os.path.getsize(path) if path else 0
+    except OSError:
+        return status, 0
+
+
+# Utterances rendered before the full run's size is estimated
+_RENDER_PILOT = 64
+
+
+def render_audio(words, workers=None, max_bytes=None):
+    """Pre-render speech for ``words`` (and cached example sentences) on all cores.
+
+    Uses the same rate and voice as ``configure_voice``.  Utterances that
+    are already in the audio cache are skipped, so an interrupted run can
+    simply be started again.  The first ``_RENDER_PILOT`` utterances give
+    an estimate of the total size; if everything would not fit within
+    ``max_bytes`` the run stops there instead of evicting its own output.
+    Returns the number of utterances that failed or were not rendered.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    if max_bytes is None:
+        max_bytes = _get_audio_cache().max_bytes
+    texts = list(words)
+    for word in words:
+        record = _cached_record(word)
+        if record is not None and record.example:
+            texts.append(record.example)
+    texts = list(dict.fromkeys(texts))
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = Counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_render_worker,
+                             initargs=(max_bytes,)) as pool:
+        pilot = texts[:_RENDER_PILOT]
+        rendered = list(pool.map(_render_utterance, pilot))
+        results.update(status for status, _ in rendered)
+        sized = [(len(text), size) for text, (_, size) in zip(pilot, rendered) if size]
+        estimate = 0
+        if sized:
+            per_char = sum(size for _, size in sized) / sum(length for length, _ in sized)
+            estimate = round(per_char * sum(map(len, texts)))
+        if estimate > max_bytes:
+            print(f"{Fore.RED}All {len(texts)} utterances need about {estimate} bytes of "
+                  f"audio, more than the {max_bytes} byte budget; stopped after {len(pilot)} "
+                  f"so that renders are not evicted.  Raise --max-bytes and "
+                  f"SPELLING_BEE_AUDIO_CACHE_BYTES.{Style.RESET_ALL}")
+        else:
+            rest = pool.map(_render_utterance, texts[len(pilot):], chunksize=16)
+            results.update(status for status, _ in rest)
+    elapsed = time.perf_counter() - start
+    rate = results["rendered"] / elapsed if elapsed else 0.0
+    print(f"Rendered {results['rendered']}, already cached {results['cached']}, "
+          f"failed {results['failed']} of {len(texts)} utterances in {elapsed:.1f}s "
+          f"({rate:.1f} utterances/s on {workers} processes)")
+    return len(texts) - results["rendered"] - results["cached"]
+
+
+def _numpy():
+    """Return the numpy module, or None if it isn't installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _score_pairs(expected, attempts):
+    """Score pairs one at a time with check_spelling and compare."""
+    correct, masks, accuracy = [], [], []
+    for word, attempt in zip(expected, attempts):
+        matches, acc = compare(word, attempt.strip())
+        correct.append(check_spelling(word, attempt))
+        masks.append("".join(["01"[match] for match in matches]))
+        accuracy.append(acc)
+    return correct, masks, accuracy
+
+
+def _align_pairs(expected, attempts):
+    """Score pairs one at a time with check_spelling and align."""
+    correct, masks, accuracy = [], [], []
+    for word, attempt in zip(expected, attempts):
+        marks, acc = align(word, attempt.strip())
+        correct.append(check_spelling(word, attempt))
+        masks.append("".join([mark[0] for mark in marks]))
+        accuracy.append(acc)
+    return correct, masks, accuracy
+
+
+def _score_ascii(np, expected, attempts):
+    """Score ASCII-only pairs as fixed-width byte arrays, all at once."""
+    n = len(expected)
+    attempts = [attempt.strip() for attempt in attempts]
+    width = max(map(len, expected))
+    # Attempts are cut to the expected width; their real lengths decide correctness
+    exp = np.array(expected, dtype=f"S{width}").view(np.uint8).reshape(n, width)
+    att = np.array(attempts, dtype=f"S{width}").view(np.uint8).reshape(n, width)
+    exp_len = np.fromiter(map(len, expected), dtype=np.intp, count=n)
+    att_len = np.fromiter(map(len, attempts), dtype=np.intp, count=n)
+    # ASCII lowercase: set bit 5 on A-Z
+    exp = exp | (((exp - 65) < 26).astype(np.uint8) << 5)
+    att = att | (((att - 65) < 26).astype(np.uint8) << 5)
+    pos = np.arange(width)
+    in_word = pos < exp_len[:, None]
+    matches = (exp == att) & in_word & (pos < att_len[:, None])
+    hits = matches.sum(axis=1)
+    # Same operations as compare, so the floats are identical
+    accuracy = hits / exp_len * 100
+    correct = (att_len == exp_len) & (hits == exp_len)
+    digits = np.where(matches, ord("1"), ord("0")).astype(np.uint8)
+    digits[~in_word] = 0  # trailing NULs are dropped from fixed-width strings
+    masks = digits.view(f"S{width}").ravel().astype(f"U{width}")
+    return correct.tolist(), masks.tolist(), accuracy.tolist()
+
+
+def score_batch(expected, attempts, mode="positional"):
+    """Score many (expected word, attempt) pairs at once.
+
+    Returns ``(correct, masks, accuracy)`` lists with one entry per pair:
+    ``check_spelling(word, attempt)``, the ``compare(word, attempt.strip())``
+    matches as a string of ``1`` and ``0``, and its accuracy.  With numpy
+    installed, ASCII pairs are packed into fixed-width byte arrays and
+    scored together; other pairs, or everything without numpy, are scored
+    one by one.  Either way the results equal the single-pair functions'.
+
+    With ``mode="alignment"`` pairs are scored with ``align`` instead, and
+    the masks are its mark codes (``=``, ``X``, ``I``, ``D``) in order.
+    Expected words must not be empty.
+    """
+    expected, attempts = list(expected), list(attempts)
+    if len(expected) != len(attempts):
+        raise ValueError("expected and attempts differ in length")
+    if not all(expected):
+        raise ValueError("expected words must not be empty")
+    if mode == "alignment":
+        return _align_pairs(expected, attempts)
+    if mode != "positional":
+        raise ValueError(f"unknown scoring mode: {mode!r}")
+    np = _numpy()
+    if np is None or not expected:
+        return _score_pairs(expected, attempts)
+    is_ascii = [word.isascii() and attempt.isascii() for word, attempt in zip(expected, attempts)]
+    if all(is_ascii):
+        return _score_ascii(np, expected, attempts)
+    n = len(expected)
+    correct, masks, accuracy = [None] * n, [None] * n, [None] * n
+    for fast in (True, False):
+        rows = [i for i in range(n) if is_ascii[i] is fast]
+        if not rows:
+            continue
+        pairs = ([expected[i] for i in rows], [attempts[i] for i in rows])
+        scored = _score_ascii(np, *pairs) if fast else _score_pairs(*pairs)
+        for i, ok, mask, acc in zip(rows, *scored):
+            correct[i], masks[i], accuracy[i] = ok, mask, acc
+    return correct, masks, accuracy
+
+
+def _read_csv_attempts(f):
+    """Yield ``(line, expected, attempt)``; malformed rows have ``expected`` None."""
+    import csv
+
+    reader = csv.reader(f)
+    for row in reader:
+        if len(row) != 2:
+            if row:
+                yield reader.line_num, None, None
+            continue
+        if (reader.line_num == 1 and row[0].strip().lower() in ("expected", "word")
+                and row[1].strip().lower() == "attempt"):
+            continue  # header
+        yield reader.line_num, row[0], row[1]
 
 
-def main():
+def _read_jsonl_attempts(f):
+    """Yield ``(line, expected, attempt)``; malformed rows have ``expected`` None."""
+    for line_num, line in enumerate(f, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            expected, attempt = row["expected"], row["attempt"]
+        except (ValueError, TypeError, KeyError):
+            yield line_num, None, None
+            continue
+        if isinstance(expected, str) and isinstance(attempt, str):
+            yield line_num, expected, attempt
+        else:
+            yield line_num, None, None
+
+
+def grade_attempts(infile, outfile, fmt="csv", report=None, chunk_size=8192,
+                   mode="positional"):
+    """Grade a stream of (expected word, attempt) pairs without playing.
+
+    Reads CSV rows or JSONL objects with ``expected`` and ``attempt``
+    from ``infile`` and writes one result per row to ``outfile`` in the
+    same format: whether the attempt is correct, a per-letter match mask
+    (``1`` where the letter is right, as ``compare`` scores it, or the
+    ``align`` marks in alignment ``mode``) and the accuracy.  Rows are
+    scored ``chunk_size`` at a time with ``score_batch``, so memory
+    stays flat for any input size.  Malformed
+    rows are skipped.  Prints aggregate stats to ``report`` (stderr by
+    default) and returns the number of malformed rows.
+    """
+    report = report or sys.stderr
+    if fmt == "jsonl":
+        rows = _read_jsonl_attempts(infile)
+        dumps = json.dumps
+
+        def write(*columns):
+            outfile.writelines(
+                dumps({"expected": expected, "attempt": attempt, "correct": correct,
+                       "matches": mask, "accuracy": accuracy}) + "\n"
+                for expected, attempt, correct, mask, accuracy in zip(*columns))
+    else:
+        import csv
+
+        rows = _read_csv_attempts(infile)
+        writer = csv.writer(outfile, lineterminator="\n")
+        writer.writerow(("expected", "attempt", "correct", "matches", "accuracy"))
+
+        def write(expected, attempts, correct, masks, accuracy):
+            writer.writerows(zip(expected, attempts, map(int, correct), masks, accuracy))
+
+    graded = correct_count = 0
+    total_accuracy = 0.0
+    malformed = 0
+    malformed_lines = []  # the first few, for the report
+    chunk_expected, chunk_attempts = [], []
+
+    def flush():
+        nonlocal graded, correct_count, total_accuracy
+        correct, masks, accuracy = score_batch(chunk_expected, chunk_attempts, mode)
+        accuracy = [round(acc, 1) for acc in accuracy]
+        write(chunk_expected, chunk_attempts, correct, masks, accuracy)
+        graded += len(correct)
+        correct_count += sum(correct)
+        total_accuracy += sum(accuracy)
+        chunk_expected.clear()
+        chunk_attempts.clear()
+
+    start = time.perf_counter()
+    for line_num, expected, attempt in rows:
+        expected = expected.strip() if expected is not None else ""
+        if not expected:
+            malformed += 1
+            if len(malformed_lines) < 10:
+                malformed_lines.append(line_num)
+            continue
+        chunk_expected.append(expected)
+        chunk_attempts.append(attempt)
+        if len(chunk_expected) >= chunk_size:
+            flush()
+    flush()
+    elapsed = time.perf_counter() - start
+
+    rate = graded / elapsed if elapsed else 0.0
+    if graded:
+        print(f"Graded {graded} attempts: {correct_count} correct "
+              f"({100 * correct_count / graded:.1f}%), mean accuracy "
+              f"{total_accuracy / graded:.1f}% in {elapsed:.1f}s ({rate:.0f} rows/s)",
+              file=report)
+    else:
+        print("No attempts to grade.", file=report)
+    if malformed:
+        shown = ", ".join(map(str, malformed_lines))
+        more = ", ..." if malformed > len(malformed_lines) else ""
+        print(f"Skipped {malformed} malformed rows (lines {shown}{more})", file=report)
+    return malformed
+
+
+def compile_word_list(source, output):
+    """Compile a text word list into a WordTrie file and report its size."""
+    start = time.perf_counter()
+    words = _read_word_file(source)
+    WordTrie.write(output, words)
+    elapsed = time.perf_counter() - start
+    trie = WordTrie(output)
+    try:
+        print(f"Compiled {len(trie)} words into {output} ({trie.nodes} trie nodes, "
+              f"{os.path.getsize(output)} bytes from {os.path.getsize(source)} bytes "
+              f"of text) in {elapsed:.1f}s")
+    finally:
+        trie.close()
+
+
+def precompute_difficulty(words, output, history_files=()):
+    """Write a DifficultyTable for ``words`` to ``output`` and report its bands."""
+    start = time.perf_counter()
+    history = _read_history(history_files)
+    DifficultyTable.write(output, words, history)
+    elapsed = time.perf_counter() - start
+    table = DifficultyTable(output)
+    try:
+        bands = ", ".join(f"{band} {table.count(sys.maxsize, band=band)}"
+                          for band in DIFFICULTY_BANDS)
+        print(f"Scored {len(table)} words ({len(history)} with miss history) into {output} "
+              f"({os.path.getsize(output)} bytes) in {elapsed:.1f}s: {bands}")
+    finally:
+        table.close()
+
+
+def play(words=None, max_length=8, difficulty=None):
+    """Run the game with words from ``words`` (WORD_LIST by default)."""
     init()
     try:
         engine = init_tts_engine()
@@ -577,15 +3362,157 @@ def main():
     except Exception as e:
         print(f"{Fore.RED}Failed to initialise text-to-speech: {e}{Style.RESET_ALL}")
         sys.exit(1)
+    if not isinstance(engine, SubprocessTTS):
+        engine = LoopingEngine(engine)
+    engine = SpeechService(engine)
     print(f"{Style.BRIGHT}Welcome to Spelling Bee!{Style.RESET_ALL}\n")
-    while True:
-        word = get_word()
-        play_round(word, engine)
-        again = input("\nTry another word? (y/n): ")
-        if again.strip().lower() != "y":
-            print(f"\n{Style.BRIGHT}Thanks for playing! Goodbye!{Style.RESET_ALL}")
-            break
-        print()
+    depth = int(os.environ.get("SPELLING_BEE_PREFETCH_DEPTH", 2))
+    prefetcher = WordPrefetcher(depth=depth, max_length=max_length, words=words,
+                                difficulty=difficulty).start()
+    if words is not None:
+        # A long custom list takes seconds to index; do it before the first miss
+        threading.Thread(target=_get_near_words, args=(words,), name="near-words",
+                         daemon=True).start()
+    degraded = False
+    try:
+        while True:
+            word = prefetcher.next_word()
+            # Half-open is still degraded: no probe has succeeded yet
+            if (dictionary_status() != CircuitBreaker.CLOSED) != degraded:
+                degraded = not degraded
+                if degraded:
+                    print(f"{Fore.YELLOW}Dictionary unavailable; playing offline "
+                          f"with built-in sentences.{Style.RESET_ALL}\n")
+                else:
+                    print(f"{Fore.GREEN}Dictionary back online.{Style.RESET_ALL}\n")
+            play_round(word, engine, words)
+            again = input("\nTry another word? (y/n): ")
+            if again.strip().lower() != "y":
+                print(f"\n{Style.BRIGHT}Thanks for playing! Goodbye!{Style.RESET_ALL}")
+                break
+            print()
+    finally:
+        prefetcher.stop()
+        engine.close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="spelling_bee.py",
+        description="Hear a word spoken aloud, then try to spell it.",
+    )
+    commands = parser.add_subparsers(dest="command")
+    warm = commands.add_parser(
+        "warm", help="fetch every word and write an offline dictionary bundle",
+    )
+    warm.add_argument("--output", default=None,
+                      help="bundle path (default: $SPELLING_BEE_BUNDLE or the cache dir)")
+    warm.add_argument("--workers", type=int, default=4,
+                      help=f"concurrent lookups (default: 4, at most {_WARM_MAX_WORKERS})")
+    render = commands.add_parser(
+        "render", help="pre-render speech audio for every word on all CPU cores",
+    )
+    render.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: number of CPU cores)")
+    render.add_argument("--max-bytes", type=int, default=None,
+                        help="audio cache budget in bytes (default: $SPELLING_BEE_AUDIO_CACHE_BYTES)")
+    grade = commands.add_parser(
+        "grade", help="grade (expected, attempt) pairs from CSV or JSONL without playing",
+    )
+    grade.add_argument("input", nargs="?", default="-",
+                       help="CSV or JSONL file of attempts (default: stdin)")
+    grade.add_argument("--output", "-o", default="-",
+                       help="where to write per-row results (default: stdout)")
+    grade.add_argument("--format", choices=("csv", "jsonl"), default=None,
+                       help="input and output format (default: from the input file's "
+                            "extension, else csv)")
+    grade.add_argument("--mode", choices=_SCORING_MODES, default=None,
+                       help="score letters by position or by edit-distance alignment "
+                            "(default: $SPELLING_BEE_SCORING, else positional)")
+    wordlist = commands.add_parser(
+        "wordlist", help="compile a word-list file (one word per line) into a word trie",
+    )
+    wordlist.add_argument("input", help="text file with one word per line")
+    wordlist.add_argument("--output", "-o", required=True, help="trie file to write")
+    difficulty = commands.add_parser(
+        "difficulty", help="precompute difficulty bands for a word list",
+    )
+    difficulty.add_argument("input", nargs="?", default=None,
+                            help="word-list file or trie (default: built-in list)")
+    difficulty.add_argument("--output", "-o", default=None,
+                            help="table file to write (default: difficulty.table in the "
+                                 "cache dir, used for the built-in list)")
+    difficulty.add_argument("--history", action="append", default=[], metavar="FILE",
+                            help="CSV or JSONL attempts, as for grade, to add to the "
+                                 "saved miss history (repeatable)")
+    parser.add_argument("--words", default=None,
+                        help="play with words from this file: one word per line, a trie "
+                             "from the wordlist subcommand or a table from difficulty "
+                             "(default: built-in list)")
+    parser.add_argument("--max-length", type=int, default=8,
+                        help="longest word to play (default: 8)")
+    parser.add_argument("--difficulty", choices=DIFFICULTY_BANDS, default=None,
+                        help="only play words in this difficulty band")
+    args = parser.parse_args(argv)
+
+    if args.command == "warm":
+        init()
+        failed = warm_cache(WORD_LIST, args.output or _bundle_path(), workers=args.workers)
+        sys.exit(1 if failed else 0)
+    if args.command == "render":
+        init()
+        failed = render_audio(WORD_LIST, workers=args.workers, max_bytes=args.max_bytes)
+        sys.exit(1 if failed else 0)
+    if args.command in (None, "grade") and getattr(args, "mode", None) is None:
+        try:
+            args.mode = _scoring_mode()
+        except ValueError as e:
+            parser.error(str(e))
+    if args.command == "grade":
+        fmt = args.format
+        if fmt is None:
+            fmt = "jsonl" if args.input.endswith((".jsonl", ".ndjson")) else "csv"
+        infile = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+        outfile = sys.stdout if args.output == "-" else open(args.output, "w", newline="",
+                                                             encoding="utf-8")
+        try:
+            failed = grade_attempts(infile, outfile, fmt, mode=args.mode)
+        finally:
+            for f in (infile, outfile):
+                if f not in (sys.stdin, sys.stdout):
+                    f.close()
+        sys.exit(1 if failed else 0)
+
+    def open_word_list(path):
+        try:
+            return load_word_list(path)
+        except (OSError, ValueError) as e:
+            parser.error(f"cannot read word list {path}: {e}")
+
+    if args.command == "wordlist":
+        try:
+            compile_word_list(args.input, args.output)
+        except OSError as e:
+            parser.error(str(e))
+        sys.exit(0)
+    if args.command == "difficulty":
+        words = open_word_list(args.input) if args.input else WORD_LIST
+        try:
+            precompute_difficulty(words, args.output or _difficulty_path(), args.history)
+        except OSError as e:
+            parser.error(str(e))
+        sys.exit(0)
+    words = open_word_list(args.words) if args.words else None
+    if args.difficulty is None:
+        available = (words if words is not None else _get_word_index()).count(args.max_length)
+    else:
+        available = _get_difficulty_table(words).count(args.max_length, band=args.difficulty)
+    if not available:
+        band = f" in the {args.difficulty} band" if args.difficulty else ""
+        parser.error(f"no words of at most {args.max_length} letters{band} to play")
+    play(words, args.max_length, args.difficulty)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,11 @@
+import io
 import json
+import os
+import random
 import subprocess
+import threading
 import pytest
+import spelling_bee
 from unittest.mock import MagicMock, patch, call
 from colorama import Fore, Style
 from spelling_bee import (
@@ -9,6 +14,14 @@ from spelling_bee import (
     SubprocessTTS, get_definition, get_sentence, configure_voice,
     WORD_LIST, _word_cache, _fetch_word_data,
     _FALLBACK_SENTENCES, _DEFAULT_SENTENCE,
+    DiskCache, _get_disk_cache, WordPrefetcher, WordIndex,
+    LRUCache, WordRecord, NegativeCache, _negative_cache,
+    CircuitBreaker, dictionary_status, DictionaryClient, DictionaryAPIError,
+    SingleFlight, WordBundle, warm_cache, main, AudioCache, render_audio,
+    SpeechService, LoopingEngine, grade_attempts, score_batch,
+    edit_distance, align, MATCH, SUBSTITUTE, INSERT,
+    NearWordIndex, format_near_words, WordTrie, load_word_list,
+    DifficultyTable, DIFFICULTY_BANDS, record_attempt,
 )
 
 
@@ -60,6 +73,136 @@ class TestGetWord:
         assert word in WORD_LIST
 
 
+class TestGetWordConcurrency:
+    def test_returns_first_validated_candidate(self):
+        valid = {"garden"}
+        with patch("spelling_bee.WORD_LIST", ["apple", "garden", "bridge"]), \
+                patch("spelling_bee.get_definition", side_effect=lambda w: "d" if w in valid else None):
+            for _ in range(10):
+                assert get_word() == "garden"
+
+    def test_validates_candidates_in_parallel(self):
+        import threading
+        barrier = threading.Barrier(3, timeout=2)
+
+        def slow_definition(word):
+            barrier.wait()  # only passes if three lookups run at once
+            return "d"
+
+        with patch("spelling_bee.WORD_LIST", ["apple", "garden", "bridge"]), \
+                patch("spelling_bee.get_definition", side_effect=slow_definition):
+            assert get_word(workers=3) in ("apple", "garden", "bridge")
+
+    def test_respects_latency_budget(self):
+        import threading
+        import time
+        release = threading.Event()
+
+        def hanging_definition(word):
+            release.wait(5)
+            return "d"
+
+        with patch("spelling_bee.get_definition", side_effect=hanging_definition):
+            start = time.monotonic()
+            word = get_word(budget=0.2)
+            elapsed = time.monotonic() - start
+        release.set()
+        assert word in WORD_LIST
+        assert elapsed < 2
+
+    @patch("spelling_bee.get_definition", return_value=None)
+    def test_falls_back_when_nothing_validates(self, _mock):
+        with patch("spelling_bee.WORD_LIST", ["apple", "garden"]):
+            assert get_word() in ("apple", "garden")
+
+
+class TestWordPrefetcher:
+    @patch("spelling_bee.get_sentence")
+    @patch("spelling_bee.get_definition")
+    @patch("spelling_bee.get_word", side_effect=["apple", "garden", "bridge", "happy"])
+    def test_warms_definition_and_sentence_ahead_of_time(self, mock_word, mock_def, mock_sent):
+        import time
+        prefetcher = WordPrefetcher(depth=2).start()
+        try:
+            deadline = time.monotonic() + 2
+            while prefetcher._queue.qsize() < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert prefetcher.next_word() == "apple"
+        finally:
+            prefetcher.stop()
+        mock_def.assert_any_call("apple")
+        mock_sent.assert_any_call("apple")
+        assert prefetcher.hits == 1
+        assert prefetcher.misses == 0
+
+    @patch("spelling_bee.get_word", return_value="apple")
+    def test_counts_miss_when_queue_is_empty(self, _mock):
+        prefetcher = WordPrefetcher(depth=3)
+        assert prefetcher.next_word() == "apple"
+        assert prefetcher.misses == 1
+        assert prefetcher.hits == 0
+
+    @patch("spelling_bee.get_sentence")
+    @patch("spelling_bee.get_definition")
+    @patch("spelling_bee.get_word", return_value="apple")
+    def test_queue_depth_is_bounded(self, mock_word, _def, _sent):
+        import time
+        prefetcher = WordPrefetcher(depth=2).start()
+        try:
+            time.sleep(0.2)
+            assert prefetcher._queue.qsize() == 2
+        finally:
+            prefetcher.stop()
+        assert not prefetcher._thread.is_alive()
+
+
+class TestWordIndex:
+    WORDS = ["a", "bee", "cat", "door", "eagle", "fig", "garden"]
+
+    def test_count_by_max_length(self):
+        index = WordIndex(self.WORDS)
+        assert index.count(3) == 4
+        assert index.count(100) == len(self.WORDS)
+        assert index.count(0) == 0
+
+    def test_count_by_length_range(self):
+        index = WordIndex(self.WORDS)
+        assert index.count(5, min_length=4) == 2
+
+    def test_sample_respects_length_range(self):
+        index = WordIndex(self.WORDS)
+        for _ in range(50):
+            for word in index.sample(3, 5, min_length=3):
+                assert 3 <= len(word) <= 5
+
+    def test_sample_is_distinct_and_capped(self):
+        index = WordIndex(self.WORDS)
+        picks = index.sample(10, 3)
+        assert sorted(picks) == ["a", "bee", "cat", "fig"]
+
+    def test_sample_covers_every_eligible_word(self):
+        index = WordIndex(self.WORDS)
+        seen = set()
+        for _ in range(200):
+            seen.update(index.sample(1, 4, min_length=3))
+        assert seen == {"bee", "cat", "fig", "door"}
+
+    def test_choice_raises_when_nothing_fits(self):
+        index = WordIndex(self.WORDS)
+        with pytest.raises(IndexError):
+            index.choice(20, min_length=10)
+
+    def test_indexes_full_word_list(self):
+        index = WordIndex(WORD_LIST)
+        assert len(index) == len(WORD_LIST)
+        assert index.count(8) == len(WORD_LIST)
+
+    def test_get_word_follows_replaced_word_list(self):
+        with patch("spelling_bee.WORD_LIST", ["zebra"]), \
+                patch("spelling_bee.get_definition", return_value="d"):
+            assert get_word() == "zebra"
+
+
 class TestCheckSpelling:
     def test_exact_match(self):
         assert check_spelling("apple", "apple") is True
@@ -160,6 +303,360 @@ class TestFormatFailure:
         assert "\u274c" in output
 
 
+def _levenshtein(a, b):
+    a, b = a.lower(), b.lower()
+    previous = list(range(len(b) + 1))
+    for i, ch in enumerate(a, 1):
+        current = [i]
+        for j, other in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ch != other)))
+        previous = current
+    return previous[-1]
+
+
+class TestAlignment:
+    def test_edit_distance_matches_dynamic_programming(self):
+        rng = random.Random(3)
+        for _ in range(2000):
+            a = "".join(rng.choice("abcAB") for _ in range(rng.randint(0, 10)))
+            b = "".join(rng.choice("abcab") for _ in range(rng.randint(0, 10)))
+            assert edit_distance(a, b) == _levenshtein(a, b), (a, b)
+
+    def test_edit_distance_beyond_machine_word(self):
+        rng = random.Random(5)
+        a = "".join(rng.choice("acgt") for _ in range(150))
+        b = "".join(rng.choice("acgt") for _ in range(120))
+        assert edit_distance(a, b) == _levenshtein(a, b)
+
+    def test_missing_letter_does_not_shift_the_rest(self):
+        marks, accuracy = align("giraffe", "jirafe")
+        assert "".join(op for op, _, _ in marks) == "X===D=="
+        assert marks[0] == (SUBSTITUTE, "g", "j")
+        assert round(accuracy, 1) == 71.4
+        assert compare("giraffe", "jirafe")[1] < accuracy
+
+    def test_extra_letter_is_an_insertion(self):
+        marks, accuracy = align("apple", "appple")
+        assert [op for op, _, _ in marks].count(INSERT) == 1
+        assert round(accuracy, 1) == 83.3
+
+    def test_exact_match_ignores_case(self):
+        marks, accuracy = align("Apple", "aPPLE")
+        assert all(op == MATCH for op, _, _ in marks)
+        assert accuracy == 100.0
+
+    def test_marks_cost_the_edit_distance_and_spell_both_words(self):
+        rng = random.Random(9)
+        for _ in range(500):
+            a = "".join(rng.choice("abc") for _ in range(rng.randint(1, 8)))
+            b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 8)))
+            marks, _ = align(a, b)
+            assert sum(op != MATCH for op, _, _ in marks) == _levenshtein(a, b)
+            assert "".join(ch for _, ch, _ in marks if ch) == a
+            assert "".join(ch for _, _, ch in marks if ch) == b
+
+    def test_format_failure_renders_marks(self):
+        marks, accuracy = align("giraffe", "jirafe")
+        output = format_failure("giraffe", marks, accuracy)
+        assert "(your spelling)" in output
+        assert f"{Fore.RED}{Style.BRIGHT}_{Style.RESET_ALL}" in output
+        assert "71%" in output
+
+    @patch("builtins.input", side_effect=["4", "jirafe"])
+    def test_play_round_uses_alignment_mode(self, mock_input, monkeypatch, capsys):
+        monkeypatch.setenv("SPELLING_BEE_SCORING", "alignment")
+        play_round("giraffe", MagicMock())
+        assert "Accuracy: 71%" in capsys.readouterr().out
+
+    def test_scoring_mode_from_environment(self, monkeypatch):
+        monkeypatch.setenv("SPELLING_BEE_SCORING", " Alignment ")
+        assert spelling_bee._scoring_mode() == "alignment"
+        monkeypatch.setenv("SPELLING_BEE_SCORING", "")
+        assert spelling_bee._scoring_mode() == "positional"
+        monkeypatch.setenv("SPELLING_BEE_SCORING", "fuzzy")
+        with pytest.raises(ValueError):
+            spelling_bee._scoring_mode()
+
+    @pytest.mark.parametrize("argv", [[], ["grade", "attempts.csv"]])
+    def test_invalid_scoring_mode_is_a_usage_error(self, argv, monkeypatch, capsys):
+        monkeypatch.setenv("SPELLING_BEE_SCORING", "fuzzy")
+        with patch("spelling_bee.play") as mock_play, pytest.raises(SystemExit) as excinfo:
+            main(argv)
+        assert excinfo.value.code == 2
+        mock_play.assert_not_called()
+        assert "SPELLING_BEE_SCORING must be one of" in capsys.readouterr().err
+
+    def test_batch_alignment_mode(self):
+        correct, masks, accuracy = score_batch(["giraffe", "cat"], ["jirafe", "CAT"],
+                                               mode="alignment")
+        assert correct == [False, True]
+        assert masks == ["X===D==", "==="]
+        assert accuracy[1] == 100.0
+        with pytest.raises(ValueError):
+            score_batch(["cat"], ["cat"], mode="phonetic")
+
+
+class TestNearWordIndex:
+    def test_matches_brute_force(self):
+        rng = random.Random(11)
+        words = list({"".join(rng.choice("abcdeo") for _ in range(rng.randint(1, 12)))
+                      for _ in range(400)})
+        index = NearWordIndex(words)
+        for _ in range(200):
+            term = "".join(rng.choice("abcdeo") for _ in range(rng.randint(0, 13)))
+            expected = sorted(pair for pair in ((edit_distance(word, term), word) for word in words)
+                              if pair[0] <= 2)
+            assert index.lookup(term) == [(word, d) for d, word in expected], term
+            assert index.lookup(term, limit=3) == [(word, d) for d, word in expected[:3]], term
+
+    def test_finds_real_word_neighbours(self):
+        index = NearWordIndex(["pray", "prey", "tray", "apple"])
+        assert index.lookup("prey", max_distance=1) == [("prey", 0), ("pray", 1)]
+        assert index.lookup("PRAY", limit=1) == [("pray", 0)]
+        assert "Tray" in index
+        assert "trey" not in index
+        assert len(index) == 4
+
+    def test_prefix_must_exceed_distance(self):
+        with pytest.raises(ValueError):
+            NearWordIndex(["apple"], max_distance=2, prefix_length=2)
+
+    def test_near_words_message(self):
+        assert "'prey' is a real word" in format_near_words("pray", "prey")
+        assert "Close real words: pray" in format_near_words("tray", "pxay")
+        assert format_near_words("pray", "qqqqqq") == ""
+        assert format_near_words("pray", " ") == ""
+
+    @patch("builtins.input", side_effect=["4", "prey"])
+    def test_play_round_flags_real_word_attempt(self, mock_input, capsys):
+        play_round("pray", MagicMock())
+        assert "'prey' is a real word too" in capsys.readouterr().out
+
+    def test_near_words_from_active_list(self):
+        words = WordTrie.build(["quokka", "quokkas", "wombat"])
+        assert "'quokkas' is a real word" in format_near_words("quokka", "quokkas", words)
+        assert "Close real words: wombat" in format_near_words("quokka", "wombet", words)
+        assert format_near_words("pray", "prey", words) == ""
+
+    @patch("builtins.input", side_effect=["4", "wombet"])
+    def test_play_round_uses_active_list(self, mock_input, capsys):
+        play_round("quokka", MagicMock(), words=["quokka", "wombat"])
+        assert "Close real words: wombat" in capsys.readouterr().out
+
+
+class TestWordTrie:
+    _WORDS = ["cat", "cats", "catalog", "car", "card", "dog", "do", "a", "zebra",
+              "café", "dogma", "doge"]
+
+    def test_round_trip_through_file(self, tmp_path):
+        path = str(tmp_path / "words.trie")
+        WordTrie.write(path, self._WORDS + ["cat"])
+        trie = WordTrie(path)
+        try:
+            assert len(trie) == len(self._WORDS)
+            assert all(word in trie for word in self._WORDS)
+            assert "ca" not in trie and "cattle" not in trie and "" not in trie
+            assert sorted(trie._word(rank) for rank in range(len(trie))) == sorted(self._WORDS)
+        finally:
+            trie.close()
+
+    def test_counts_match_brute_force(self):
+        rng = random.Random(5)
+        words = list({"".join(rng.choice("abcé") for _ in range(rng.randint(1, 9)))
+                      for _ in range(500)})
+        trie = WordTrie.build(words)
+        for prefix in ("", "a", "ab", "é", "cab", "zz"):
+            for low, high in ((1, 9), (3, 5), (4, 4), (6, 2), (1, 20)):
+                expected = [w for w in words if w.startswith(prefix) and low <= len(w) <= high]
+                assert trie.count(high, low, prefix) == len(expected), (prefix, low, high)
+                sample = trie.sample(10, high, low, prefix)
+                assert len(sample) == len(set(sample)) == min(10, len(expected))
+                assert set(sample) <= set(expected)
+
+    def test_choice_raises_when_nothing_fits(self):
+        trie = WordTrie.build(self._WORDS)
+        assert trie.choice(3, min_length=3, prefix="ca") in ("cat", "car")
+        with pytest.raises(IndexError):
+            trie.choice(8, prefix="x")
+
+    def test_rejects_other_files(self, tmp_path):
+        path = tmp_path / "words.trie"
+        path.write_bytes(b"not a trie at all, just some bytes")
+        with pytest.raises(ValueError):
+            WordTrie(str(path))
+
+    def test_load_word_list_compiles_text_once(self, tmp_path):
+        source = tmp_path / "words.txt"
+        source.write_text("# pets\ncat\n\ndog  # loyal\ncats\n", encoding="utf-8")
+        trie = load_word_list(str(source))
+        assert len(trie) == 3 and "dog" in trie
+        trie.close()
+        with patch("spelling_bee._read_word_file") as mock_read:
+            trie = load_word_list(str(source))
+        mock_read.assert_not_called()
+        assert "cats" in trie
+        trie.close()
+
+    def test_load_word_list_recompiles_edits_in_place(self, tmp_path):
+        source = tmp_path / "words.txt"
+        for i, text in enumerate(["cat\n", "cat\ndog\n", "cat\ndog\nemu\n"]):
+            source.write_text(text, encoding="utf-8")
+            os.utime(source, ns=(i * 10**9, i * 10**9))
+            trie = load_word_list(str(source))
+            assert len(trie) == i + 1
+            trie.close()
+        compiled = os.listdir(os.path.join(spelling_bee._cache_dir(), "wordlists"))
+        assert len([name for name in compiled if name.endswith(".trie")]) == 1
+
+    def test_get_word_draws_from_word_list(self, tmp_path):
+        path = str(tmp_path / "words.trie")
+        WordTrie.write(path, ["quokka", "axolotl", "pangolinsaurus"])
+        trie = load_word_list(path)
+        with patch("spelling_bee._fetch_word_data", return_value=_MOCK_WORD_DATA):
+            assert get_word(max_length=7, words=trie) in ("quokka", "axolotl")
+        trie.close()
+
+    def test_wordlist_subcommand(self, tmp_path, capsys):
+        source = tmp_path / "words.txt"
+        source.write_text("apple\nbanana\n", encoding="utf-8")
+        output = tmp_path / "words.trie"
+        with pytest.raises(SystemExit) as excinfo:
+            main(["wordlist", str(source), "--output", str(output)])
+        assert excinfo.value.code == 0
+        assert "Compiled 2 words" in capsys.readouterr().out
+        trie = WordTrie(str(output))
+        assert "banana" in trie
+        trie.close()
+
+    @pytest.mark.parametrize("argv", [
+        ["--max-length", "3"],
+        ["--words", "missing.txt"],
+        ["--max-length", "2", "--difficulty", "hard"],
+        ["wordlist", "missing.txt", "-o", "words.trie"],
+    ])
+    def test_bad_options_exit_before_playing(self, argv, tmp_path, monkeypatch, capsys):
+        monkeypatch.chdir(tmp_path)
+        with patch("spelling_bee.play") as mock_play, pytest.raises(SystemExit) as excinfo:
+            main(argv)
+        assert excinfo.value.code == 2
+        mock_play.assert_not_called()
+        assert "error:" in capsys.readouterr().err
+
+    def test_valid_options_start_the_game(self, tmp_path):
+        source = tmp_path / "words.txt"
+        source.write_text("cat\nzebra\n", encoding="utf-8")
+        with patch("spelling_bee.play") as mock_play:
+            main(["--words", str(source), "--max-length", "3"])
+        words, max_length, difficulty = mock_play.call_args.args
+        assert "cat" in words and max_length == 3 and difficulty is None
+
+
+class TestDifficultyTable:
+    def test_features(self):
+        table = DifficultyTable.build(WORD_LIST)
+        knight = table.features("knight")
+        assert (knight["doubled"], knight["silent"]) == (0, 2)
+        assert table.features("tomorrow")["doubled"] == 1
+        assert table.features("not a word") is None
+        assert all(0 <= table.features(word)["score"] <= 1 for word in WORD_LIST)
+
+    def test_bands_match_brute_force(self):
+        table = DifficultyTable.build(WORD_LIST)
+        assert sorted(table) == sorted(set(WORD_LIST))
+        bands = {word: table.features(word)["band"] for word in WORD_LIST}
+        sizes = [list(bands.values()).count(band) for band in DIFFICULTY_BANDS]
+        assert max(sizes) - min(sizes) <= 1
+        for band in DIFFICULTY_BANDS + (None,):
+            for low, high in ((1, 8), (5, 6), (7, 7), (9, 3), (1, 50)):
+                expected = {word for word in WORD_LIST
+                            if band in (None, bands[word]) and low <= len(word) <= high}
+                assert table.count(high, low, band) == len(expected), (band, low, high)
+                sample = table.sample(20, high, low, band)
+                assert len(sample) == len(set(sample)) == min(20, len(expected))
+                assert set(sample) <= expected
+        with pytest.raises(ValueError):
+            table.count(8, band="impossible")
+        with pytest.raises(IndexError):
+            table.choice(2, band="hard")
+
+    def test_miss_history_raises_score(self):
+        words = ["apple", "banana", "cherry", "damson"]
+        before = DifficultyTable.build(words).features("apple")["score"]
+        after = DifficultyTable.build(words, {"apple": [10, 9], "banana": [10, 1]})
+        assert after.features("apple")["score"] > before
+        assert after.features("apple")["miss_rate"] > after.features("banana")["miss_rate"]
+
+    def test_round_trip_through_file(self, tmp_path):
+        path = str(tmp_path / "words.table")
+        DifficultyTable.write(path, WORD_LIST)
+        table = load_word_list(path)
+        try:
+            assert isinstance(table, DifficultyTable)
+            assert table.features("ooze") == DifficultyTable.build(WORD_LIST).features("ooze")
+        finally:
+            table.close()
+
+    def test_uses_precomputed_table_for_word_list(self):
+        DifficultyTable.write(spelling_bee._difficulty_path(), WORD_LIST)
+        with patch.object(DifficultyTable, "build") as mock_build:
+            table = spelling_bee._get_difficulty_table()
+        mock_build.assert_not_called()
+        assert table._mm is not None
+
+    def test_rebuilds_when_precomputed_table_is_stale(self):
+        DifficultyTable.write(spelling_bee._difficulty_path(), WORD_LIST[:10])
+        table = spelling_bee._get_difficulty_table()
+        assert len(table) == len(set(WORD_LIST))
+        assert spelling_bee._get_difficulty_table() is table
+
+    @patch("spelling_bee._fetch_word_data", return_value=_MOCK_WORD_DATA)
+    def test_get_word_by_difficulty(self, _mock):
+        table = spelling_bee._get_difficulty_table()
+        for band in DIFFICULTY_BANDS:
+            word = get_word(difficulty=band)
+            assert len(word) <= 8
+            assert table.features(word)["band"] == band
+
+    @patch("spelling_bee.get_definition", return_value=None)
+    def test_get_word_keeps_band_when_validation_fails(self, _mock):
+        table = spelling_bee._get_difficulty_table()
+        for _ in range(30):
+            assert table.features(get_word(difficulty="hard", budget=1.0))["band"] == "hard"
+
+    @patch("builtins.input", side_effect=["4", "pray", "4", "prey"])
+    def test_play_round_records_history(self, mock_input):
+        play_round("pray", MagicMock())
+        play_round("pray", MagicMock())
+        record_attempt("ooze", False)
+        assert spelling_bee._read_history() == {"pray": [2, 1], "ooze": [1, 1]}
+
+    def test_concurrent_games_keep_every_attempt(self):
+        threads = [threading.Thread(target=lambda: [record_attempt("ooze", i % 2)
+                                                     for i in range(50)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log = os.path.join(spelling_bee._cache_dir(), "history.log")
+        with open(log, "a", encoding="utf-8") as f:
+            f.write("garbled line\n")
+        assert spelling_bee._read_history() == {"ooze": [200, 100]}
+
+    def test_difficulty_subcommand(self, tmp_path, capsys):
+        attempts = tmp_path / "attempts.csv"
+        attempts.write_text("expected,attempt\nooze,ouze\nooze,oze\nhistory,history\n", encoding="utf-8")
+        output = tmp_path / "words.table"
+        with pytest.raises(SystemExit) as excinfo:
+            main(["difficulty", "--history", str(attempts), "--output", str(output)])
+        assert excinfo.value.code == 0
+        assert f"Scored {len(set(WORD_LIST))} words (2 with miss history)" in capsys.readouterr().out
+        table = DifficultyTable(str(output))
+        assert table.features("ooze")["miss_rate"] > table.features("history")["miss_rate"]
+        table.close()
+
+
 class TestSpeakWord:
     def test_calls_say_with_word(self):
         engine = MagicMock()
@@ -180,6 +677,250 @@ class TestSpeakWord:
         assert call_order == ["say", "runAndWait"]
 
 
+class _BlockingEngine:
+    """Fake engine whose runAndWait blocks until stop() or release."""
+
+    def __init__(self):
+        import threading
+        self.spoken = []
+        self.stops = 0
+        self._pending = []
+        self._release = threading.Event()
+        self.started = threading.Event()
+
+    def say(self, text):
+        self._pending.append(text)
+
+    def runAndWait(self):
+        self.started.set()
+        self._release.wait(2)
+        self._release.clear()
+        self.spoken.extend(self._pending)
+        self._pending = []
+
+    def stop(self):
+        self.stops += 1
+        self._release.set()
+
+    def release(self):
+        self._release.set()
+
+
+class TestSpeechService:
+    def test_run_and_wait_returns_immediately(self):
+        import time
+        engine = _BlockingEngine()
+        service = SpeechService(engine)
+        try:
+            start = time.monotonic()
+            speak_word("a long example sentence", service)
+            assert time.monotonic() - start < 0.5
+            assert engine.started.wait(1)
+            engine.release()
+            assert service.wait(2)
+        finally:
+            service.close()
+        assert engine.spoken == ["a long example sentence"]
+
+    def test_new_speech_interrupts_current(self):
+        engine = _BlockingEngine()
+        service = SpeechService(engine)
+        try:
+            speak_word("sentence", service)
+            assert engine.started.wait(1)
+            engine.started.clear()
+            speak_word("word", service)
+            assert engine.stops == 1
+            assert engine.started.wait(1)
+            engine.release()
+            assert service.wait(2)
+        finally:
+            service.close()
+        assert engine.spoken == ["sentence", "word"]
+
+    def test_works_with_pyttsx3_style_mock(self):
+        engine = MagicMock()
+        service = SpeechService(engine)
+        try:
+            speak_word("hello", service)
+            assert service.wait(2)
+        finally:
+            service.close()
+        engine.say.assert_called_once_with("hello")
+        engine.runAndWait.assert_called_once()
+
+    def test_engine_errors_do_not_kill_the_thread(self):
+        engine = MagicMock()
+        engine.runAndWait.side_effect = [RuntimeError("driver"), None]
+        service = SpeechService(engine)
+        try:
+            speak_word("one", service)
+            assert service.wait(2)
+            speak_word("two", service)
+            assert service.wait(2)
+        finally:
+            service.close()
+        assert engine.runAndWait.call_count == 2
+
+    def test_subprocess_tts_stop_kills_current_process(self, tmp_path):
+        import sys
+        import time
+        with patch("shutil.which", return_value=None):
+            tts = SubprocessTTS()
+        tts._commands = [[sys.executable, "-c", "import time; time.sleep(10)"]]
+        service = SpeechService(tts)
+        try:
+            speak_word("ignored", service)
+            deadline = time.monotonic() + 2
+            while tts._current is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+            start = time.monotonic()
+            service.cancel()
+            assert service.wait(2)
+            assert time.monotonic() - start < 2
+        finally:
+            service.close()
+
+
+class _FakeLoopDriver:
+    """Mimics a pyttsx3 engine driven by an external loop."""
+
+    def __init__(self, fail_start=False):
+        self.fail_start = fail_start
+        self.loops_started = 0
+        self.loops_ended = 0
+        self.spoken = []
+        self.threads = set()
+        self.run_and_wait_calls = 0
+        self._queue = []
+        self._callbacks = []
+
+    def connect(self, topic, cb):
+        assert topic == "finished-utterance"
+        self._callbacks.append(cb)
+
+    def startLoop(self, use_driver_loop=True):
+        import threading
+        assert use_driver_loop is False
+        if self.fail_start:
+            raise RuntimeError("no external loop")
+        self.loops_started += 1
+        self.threads.add(threading.current_thread())
+
+    def endLoop(self):
+        self.loops_ended += 1
+
+    def say(self, text, name=None):
+        import threading
+        self.threads.add(threading.current_thread())
+        self._queue.append((text, name))
+
+    def iterate(self):
+        if self._queue:
+            text, name = self._queue.pop(0)
+            self.spoken.append(text)
+            for cb in self._callbacks:
+                cb(name, True)
+
+    def stop(self):
+        self._queue = []
+
+    def runAndWait(self):
+        self.run_and_wait_calls += 1
+        self.spoken.extend(text for text, _ in self._queue)
+        self._queue = []
+
+
+class TestLoopingEngine:
+    def test_loop_started_once_for_many_utterances(self):
+        driver = _FakeLoopDriver()
+        engine = LoopingEngine(driver)
+        try:
+            for word in ("apple", "garden", "bridge"):
+                speak_word(word, engine)
+                assert driver.spoken[-1] == word   # runAndWait waited for completion
+        finally:
+            engine.close()
+        assert driver.loops_started == 1
+        assert driver.loops_ended == 1
+
+    def test_engine_only_touched_from_loop_thread(self):
+        driver = _FakeLoopDriver()
+        engine = LoopingEngine(driver)
+        try:
+            speak_word("apple", engine)
+            speak_word("garden", engine)
+        finally:
+            engine.close()
+        assert driver.threads == {engine._thread}
+
+    def test_completion_callbacks(self):
+        driver = _FakeLoopDriver()
+        engine = LoopingEngine(driver)
+        finished = []
+        engine.on_finished(lambda text, completed: finished.append((text, completed)))
+        try:
+            speak_word("apple", engine)
+        finally:
+            engine.close()
+        assert finished == [("apple", True)]
+
+    def test_stop_releases_waiters(self):
+        import threading
+        import time
+        driver = _FakeLoopDriver()
+        driver.iterate = lambda: None         # never finishes speaking
+        engine = LoopingEngine(driver, timeout=5)
+        try:
+            done = threading.Event()
+            t = threading.Thread(target=lambda: (speak_word("apple", engine), done.set()))
+            t.start()
+            time.sleep(0.05)
+            engine.stop()
+            assert done.wait(1)
+        finally:
+            engine.close()
+
+    def test_falls_back_when_driver_has_no_external_loop(self):
+        driver = _FakeLoopDriver(fail_start=True)
+        engine = LoopingEngine(driver)
+        engine._thread.join(1)
+        speak_word("apple", engine)
+        assert driver.spoken == ["apple"]
+        assert driver.run_and_wait_calls == 1
+
+    def test_falls_back_when_driver_fails_mid_loop(self):
+        import time
+        driver = _FakeLoopDriver()
+
+        def iterate():
+            raise RuntimeError("driver crashed")
+        driver.iterate = iterate
+        engine = LoopingEngine(driver, timeout=30)
+        engine._thread.join(1)
+        assert engine._broken
+        assert driver.loops_ended == 1
+        start = time.monotonic()
+        speak_word("apple", engine)
+        assert time.monotonic() - start < 5
+        assert driver.run_and_wait_calls == 1
+
+    def test_crash_while_speaking_releases_waiter(self):
+        import time
+        driver = _FakeLoopDriver()
+
+        def iterate():
+            if driver._queue:
+                raise RuntimeError("driver crashed")
+        driver.iterate = iterate
+        engine = LoopingEngine(driver, timeout=30)
+        start = time.monotonic()
+        speak_word("apple", engine)
+        assert time.monotonic() - start < 5
+        engine._thread.join(1)
+        assert engine._broken
+
+
 class TestFetchWordData:
     @pytest.fixture(autouse=True)
     def _clear_cache(self):
@@ -187,12 +928,533 @@ class TestFetchWordData:
         yield
         _word_cache.clear()
 
-    @patch("urllib.request.urlopen", side_effect=Exception("network error"))
-    def test_does_not_cache_failures(self, mock_urlopen):
+    @patch.object(DictionaryClient, "fetch", side_effect=Exception("network error"))
+    def test_does_not_cache_failures(self, mock_fetch):
         result = _fetch_word_data("testword")
         assert result is None
         assert "testword" not in _word_cache
 
+    @patch.object(DictionaryClient, "fetch", return_value=_MOCK_WORD_DATA)
+    def test_successful_fetch_is_written_to_disk(self, mock_fetch):
+        assert _fetch_word_data("testword") == _MOCK_WORD_DATA
+        assert _get_disk_cache().get("testword") == _MOCK_WORD_DATA
+
+    @patch.object(DictionaryClient, "fetch", side_effect=Exception("network error"))
+    def test_cold_start_served_from_disk_without_network(self, mock_fetch):
+        _get_disk_cache().set("testword", _MOCK_WORD_DATA)
+        assert _fetch_word_data("testword") == _MOCK_WORD_DATA
+        assert get_definition("testword") == "test definition"
+        mock_fetch.assert_not_called()
+
+
+class TestNegativeCaching:
+    def test_not_found_is_not_retried(self):
+        with patch.object(DictionaryClient, "fetch", side_effect=DictionaryAPIError(404)) as mock_fetch:
+            assert get_definition("qwzx") is None
+            assert get_sentence("qwzx") == _DEFAULT_SENTENCE.format(word="qwzx")
+        mock_fetch.assert_called_once()
+
+    def test_transient_failure_is_not_retried_immediately(self):
+        with patch.object(DictionaryClient, "fetch", side_effect=OSError("timed out")) as mock_fetch:
+            _fetch_word_data("apple")
+            _fetch_word_data("apple")
+        mock_fetch.assert_called_once()
+
+    def test_server_error_counts_as_transient(self):
+        with patch.object(DictionaryClient, "fetch", side_effect=DictionaryAPIError(503)):
+            _fetch_word_data("apple")
+        assert _negative_cache._entries.get("apple")[1] == 1
+
+
+class TestNegativeCache:
+    def test_unknown_word_is_not_blocked(self):
+        assert not NegativeCache().blocked("apple")
+
+    def test_missing_uses_long_ttl(self):
+        cache = NegativeCache(missing_ttl=3600)
+        with patch("time.monotonic", return_value=100.0):
+            cache.record_missing("apple")
+        with patch("time.monotonic", return_value=3000.0):
+            assert cache.blocked("apple")
+        with patch("time.monotonic", return_value=3701.0):
+            assert not cache.blocked("apple")
+
+    def test_transient_failures_back_off_exponentially(self):
+        cache = NegativeCache(base_delay=2.0, max_delay=10.0)
+        delays = []
+        with patch("time.monotonic", return_value=0.0):
+            for _ in range(5):
+                cache.record_failure("apple")
+                delays.append(cache._entries.get("apple")[0])
+        assert delays == [2.0, 4.0, 8.0, 10.0, 10.0]
+
+    def test_success_resets_backoff(self):
+        cache = NegativeCache()
+        cache.record_failure("apple")
+        cache.record_success("apple")
+        assert not cache.blocked("apple")
+        with patch("time.monotonic", return_value=0.0):
+            cache.record_failure("apple")
+        assert cache._entries.get("apple") == (cache.base_delay, 1)
+
+    @patch("spelling_bee._speculate")
+    def test_round_blocks_on_a_dead_lookup_only_once(self, _mock_speculate, monkeypatch):
+        clock = [1000.0]
+        client = MagicMock()
+        client.fetch.side_effect = TimeoutError("timed out")
+        monkeypatch.setattr(spelling_bee, "_dictionary_client", client)
+
+        replies = iter(["2", "3", "4", "apple"])
+
+        def answer(prompt):
+            clock[0] += 30.0  # a player pausing between menu choices
+            return next(replies)
+
+        with patch("time.monotonic", side_effect=lambda: clock[0]), \
+                patch("builtins.input", side_effect=answer):
+            play_round("apple", MagicMock())
+        client.fetch.assert_called_once()
+
+
+class TestCircuitBreaker:
+    def test_starts_closed(self):
+        breaker = CircuitBreaker()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.allow()
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        for _ in range(2):
+            breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+    def test_success_resets_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_allows_a_single_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        with patch("time.monotonic", return_value=0.0):
+            breaker.record_failure()
+        with patch("time.monotonic", return_value=11.0):
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert breaker.allow()
+            assert not breaker.allow()
+
+    def test_successful_probe_closes(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10)
+        with patch("time.monotonic", return_value=0.0):
+            for _ in range(5):
+                breaker.record_failure()
+        with patch("time.monotonic", return_value=11.0):
+            assert breaker.allow()
+            breaker.record_failure()
+            assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestOfflineMode:
+    def test_lookups_short_circuit_once_tripped(self):
+        with patch.object(DictionaryClient, "fetch", side_effect=OSError("no network")) as mock_fetch:
+            for word in ("apple", "garden", "bridge", "happy", "kitchen"):
+                _fetch_word_data(word)
+        assert mock_fetch.call_count == 3
+        assert dictionary_status() == CircuitBreaker.OPEN
+
+    def test_sentence_uses_local_fallback_when_offline(self):
+        with patch.object(DictionaryClient, "fetch", side_effect=OSError("no network")):
+            for word in ("apple", "garden", "bridge"):
+                _fetch_word_data(word)
+            assert get_sentence("happy") == _DEFAULT_SENTENCE.format(word="happy")
+
+    def test_get_word_skips_validation_when_offline(self):
+        with patch.object(DictionaryClient, "fetch", side_effect=OSError("no network")):
+            for word in ("apple", "garden", "bridge"):
+                _fetch_word_data(word)
+        with patch("spelling_bee.get_definition") as mock_def:
+            assert get_word() in WORD_LIST
+        mock_def.assert_not_called()
+
+    def test_not_found_does_not_trip_breaker(self):
+        with patch.object(DictionaryClient, "fetch", side_effect=DictionaryAPIError(404)):
+            for word in ("qa", "qb", "qc", "qd"):
+                _fetch_word_data(word)
+        assert dictionary_status() == CircuitBreaker.CLOSED
+
+
+class TestDictionaryClient:
+    @pytest.fixture
+    def server(self):
+        import http.client
+        import http.server
+        import threading
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            peers = []
+
+            def do_GET(self):
+                Handler.peers.append(self.client_address)
+                word = self.path.rsplit("/", 1)[-1]
+                if word == "missing":
+                    body, status = b'{"title": "No Definitions Found"}', 404
+                else:
+                    body, status = json.dumps(_MOCK_WORD_DATA).encode(), 200
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=httpd.serve_forever, args=(0.01,), daemon=True)
+        thread.start()
+        client = DictionaryClient(host="127.0.0.1", port=httpd.server_address[1],
+                                  connection_class=http.client.HTTPConnection)
+        yield client, Handler.peers
+        client.close()
+        httpd.shutdown()
+        httpd.server_close()
+
+    def test_fetch_decodes_json(self, server):
+        client, _ = server
+        assert client.fetch("apple") == _MOCK_WORD_DATA
+
+    def test_reuses_connection_between_requests(self, server):
+        client, peers = server
+        for word in ("apple", "garden", "bridge"):
+            client.fetch(word)
+        assert len(peers) == 3
+        assert len(set(peers)) == 1
+
+    def test_non_200_raises_with_status(self, server):
+        client, _ = server
+        with pytest.raises(DictionaryAPIError) as excinfo:
+            client.fetch("missing")
+        assert excinfo.value.status == 404
+
+    def test_reconnects_when_pooled_connection_is_dead(self, server):
+        import socket
+
+        client, peers = server
+        client.fetch("apple")
+        client._idle[0].sock.shutdown(socket.SHUT_RDWR)
+        assert client.fetch("garden") == _MOCK_WORD_DATA
+        assert len(set(peers)) == 2
+
+    def test_timeouts_are_not_retried(self):
+        stale, fresh = MagicMock(), MagicMock()
+        for conn in (stale, fresh):
+            conn.getresponse.side_effect = TimeoutError("timed out")
+        opened = []
+        client = DictionaryClient(max_idle=4, connection_class=lambda *a, **kw: opened.append(1))
+        client._idle = [MagicMock(), MagicMock(), MagicMock(), stale]
+        with pytest.raises(TimeoutError):
+            client.fetch("apple")
+        stale.request.assert_called_once()
+        assert opened == []
+        assert len(client._idle) == 3
+
+    def test_stale_connection_is_retried_once_on_a_new_connection(self):
+        import http.client
+
+        fresh = MagicMock()
+        fresh.getresponse.side_effect = http.client.RemoteDisconnected("closed")
+        client = DictionaryClient(connection_class=MagicMock(return_value=fresh))
+        idle = [MagicMock(), MagicMock()]
+        for conn in idle:
+            conn.getresponse.side_effect = ConnectionResetError()
+        client._idle = list(idle)
+        with pytest.raises(http.client.RemoteDisconnected):
+            client.fetch("apple")
+        assert idle[1].request.call_count == 1 and fresh.request.call_count == 1
+        assert client._idle == [idle[0]]
+
+    def test_idle_pool_is_bounded(self):
+        client = DictionaryClient(max_idle=1)
+        first, second = MagicMock(), MagicMock()
+        client._checkin(first)
+        client._checkin(second)
+        assert client._idle == [first]
+        second.close.assert_called_once()
+
+    def test_thread_safe_concurrent_fetches(self, server):
+        from concurrent.futures import ThreadPoolExecutor
+        client, _ = server
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(client.fetch, [f"w{i}" for i in range(20)]))
+        assert all(r == _MOCK_WORD_DATA for r in results)
+        assert len(client._idle) <= client.max_idle
+
+
+class TestSingleFlight:
+    def test_concurrent_callers_share_one_call(self):
+        import threading
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def slow(key):
+            calls.append(key)
+            started.set()
+            release.wait(2)
+            return key.upper()
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(flight.do("a", slow, "a")))
+        leader.start()
+        started.wait(2)
+        followers = [threading.Thread(target=lambda: results.append(flight.do("a", slow, "a")))
+                     for _ in range(3)]
+        for t in followers:
+            t.start()
+        while flight.saved.get("a", 0) < 3:
+            threading.Event().wait(0.001)
+        release.set()
+        for t in [leader] + followers:
+            t.join()
+        assert calls == ["a"]
+        assert results == ["A"] * 4
+        assert flight.saved["a"] == 3
+
+    def test_error_is_shared_with_waiters(self):
+        import threading
+        flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def failing():
+            started.set()
+            release.wait(2)
+            raise OSError("boom")
+
+        errors = []
+
+        def call():
+            try:
+                flight.do("k", failing)
+            except OSError as e:
+                errors.append(e)
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        started.wait(2)
+        follower = threading.Thread(target=call)
+        follower.start()
+        while flight.saved.get("k", 0) < 1:
+            threading.Event().wait(0.001)
+        release.set()
+        leader.join()
+        follower.join()
+        assert len(errors) == 2
+
+    def test_sequential_calls_are_not_coalesced(self):
+        flight = SingleFlight()
+        fn = MagicMock(return_value=1)
+        flight.do("k", fn)
+        flight.do("k", fn)
+        assert fn.call_count == 2
+        assert flight.saved.get("k", 0) == 0
+
+    def test_per_key_counts_are_bounded(self):
+        flight = SingleFlight(max_keys=2)
+        for key in ("a", "b", "c"):
+            flight._in_flight[key] = MagicMock(result=MagicMock(return_value=key))
+            assert flight.do(key, MagicMock()) == key
+        assert len(flight.saved) == 2 and "a" not in flight.saved
+        assert flight.saved["c"] == 1
+        assert flight.saved_total == 3
+
+    def test_concurrent_definition_and_sentence_fetch_once(self):
+        import threading
+        import time
+
+        def slow_fetch(word):
+            time.sleep(0.1)
+            return _MOCK_WORD_DATA
+
+        with patch("spelling_bee._fetch_word_data", side_effect=slow_fetch) as mock_fetch:
+            threads = [threading.Thread(target=get_definition, args=("apple",)),
+                       threading.Thread(target=get_sentence, args=("apple",))]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        mock_fetch.assert_called_once_with("apple")
+
+
+class TestWordBundle:
+    RECORDS = {
+        "apple": WordRecord("a round fruit", "I ate an apple.", "noun"),
+        "garden": WordRecord("a plot of land", None, "noun"),
+        "café": WordRecord("a small restaurant", "We met at the café.", None),
+    }
+
+    def test_round_trips_records(self, tmp_path):
+        path = str(tmp_path / "words.bundle")
+        WordBundle.write(path, self.RECORDS)
+        bundle = WordBundle(path)
+        assert len(bundle) == 3
+        for word, record in self.RECORDS.items():
+            assert bundle.get(word) == record
+
+    def test_unknown_word_returns_none(self, tmp_path):
+        path = str(tmp_path / "words.bundle")
+        WordBundle.write(path, self.RECORDS)
+        bundle = WordBundle(path)
+        assert bundle.get("zebra") is None
+        assert "zebra" not in bundle
+        assert "apple" in bundle
+
+    def test_empty_bundle(self, tmp_path):
+        path = str(tmp_path / "words.bundle")
+        WordBundle.write(path, {})
+        assert WordBundle(path).get("apple") is None
+
+    def test_rejects_foreign_file(self, tmp_path):
+        path = tmp_path / "words.bundle"
+        path.write_bytes(b"not a bundle at all")
+        with pytest.raises(ValueError):
+            WordBundle(str(path))
+
+    def test_lookups_use_bundle_without_network(self, tmp_path, monkeypatch):
+        path = str(tmp_path / "words.bundle")
+        WordBundle.write(path, self.RECORDS)
+        monkeypatch.setenv("SPELLING_BEE_BUNDLE", path)
+        with patch("spelling_bee._fetch_word_data") as mock_fetch:
+            assert get_definition("apple") == "a round fruit"
+            assert get_sentence("garden") == _FALLBACK_SENTENCES["noun"].format(word="garden")
+        mock_fetch.assert_not_called()
+
+
+class TestDiskCache:
+    def test_round_trips_values(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "c.sqlite3"))
+        cache.set("apple", _MOCK_WORD_DATA)
+        assert cache.get("apple") == _MOCK_WORD_DATA
+
+    def test_missing_key_returns_none(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "c.sqlite3"))
+        assert cache.get("nope") is None
+
+    def test_survives_reopen(self, tmp_path):
+        path = str(tmp_path / "c.sqlite3")
+        DiskCache(path).set("apple", _MOCK_WORD_DATA)
+        assert DiskCache(path).get("apple") == _MOCK_WORD_DATA
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "c.sqlite3"), ttl=-1)
+        cache.set("apple", _MOCK_WORD_DATA)
+        assert cache.get("apple") is None
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = DiskCache(str(tmp_path / "c.sqlite3"), max_entries=2)
+        import time
+        now = time.time()
+        with patch("time.time", side_effect=[now, now + 1, now + 2, now + 3]):
+            cache.set("a", 1)
+            cache.set("b", 2)
+            cache.get("a")      # refresh "a" so "b" is the LRU entry
+            cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_unwritable_location_degrades_silently(self, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        cache = DiskCache(str(blocker / "c.sqlite3"))
+        cache.set("apple", 1)
+        assert cache.get("apple") is None
+
+    def test_shared_between_threads(self, tmp_path):
+        import threading
+        cache = DiskCache(str(tmp_path / "c.sqlite3"))
+        threads = [
+            threading.Thread(target=cache.set, args=(f"w{i}", i)) for i in range(8)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sorted(cache.get(f"w{i}") for i in range(8)) == list(range(8))
+
+
+class TestWordRecord:
+    def test_extracts_only_used_fields(self):
+        data = [{
+            "word": "apple",
+            "phonetics": [{"text": "/ˈæp.əl/", "audio": "https://example.com/a.mp3"}],
+            "license": {"name": "CC BY-SA 3.0"},
+            "sourceUrls": ["https://example.com"],
+            "meanings": [{"partOfSpeech": "noun", "synonyms": ["pome"],
+                          "definitions": [{"definition": "a round fruit",
+                                           "example": "I ate an apple."}]}],
+        }]
+        record = WordRecord.from_api(data)
+        assert record == WordRecord("a round fruit", "I ate an apple.", "noun")
+
+    def test_has_no_instance_dict(self):
+        assert not hasattr(WordRecord(), "__dict__")
+
+    def test_example_searched_across_meanings(self):
+        data = [{"meanings": [
+            {"partOfSpeech": "verb", "definitions": [{"definition": "one"}]},
+            {"partOfSpeech": "noun", "definitions": [{"definition": "two", "example": "Ex."}]},
+        ]}]
+        record = WordRecord.from_api(data)
+        assert record.definition == "one"
+        assert record.example == "Ex."
+        assert record.part_of_speech == "verb"
+
+    def test_missing_fields_are_none(self):
+        assert WordRecord.from_api([{"meanings": []}]) == WordRecord()
+
+    @patch("spelling_bee._fetch_word_data", return_value=_MOCK_WORD_DATA)
+    def test_record_is_fetched_once_for_definition_and_sentence(self, mock_fetch):
+        get_definition("apple")
+        get_sentence("apple")
+        mock_fetch.assert_called_once_with("apple")
+
+
+class TestLRUCache:
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache["a"] = 1
+        cache["b"] = 2
+        cache.get("a")
+        cache["c"] = 3
+        assert "a" in cache and "c" in cache
+        assert "b" not in cache
+
+    def test_size_stays_bounded(self):
+        cache = LRUCache(maxsize=10)
+        for i in range(1000):
+            cache[i] = i
+        assert len(cache) == 10
+
+    def test_get_default(self):
+        assert LRUCache().get("missing", "x") == "x"
+
+    def test_word_cache_is_bounded(self):
+        assert isinstance(_word_cache, LRUCache)
+        assert _word_cache.maxsize > 0
+
 
 class TestGetDefinition:
     @patch("spelling_bee._fetch_word_data", return_value=[{
@@ -390,6 +1652,72 @@ class TestPlayRound:
         assert "4." in captured.out
 
 
+class TestSpeculativeFetch:
+    def test_fetch_starts_before_the_player_chooses(self):
+        started = threading.Event()
+
+        def fetch(word):
+            started.set()
+            return _MOCK_WORD_DATA
+
+        def answer(prompt=""):
+            assert started.wait(1), "lookup had not started when the menu was shown"
+            return "4" if "option" in prompt else "apple"
+
+        with patch("spelling_bee._fetch_word_data", side_effect=fetch), \
+             patch("builtins.input", side_effect=answer):
+            play_round("apple", MagicMock())
+
+    def test_menu_options_share_the_in_flight_fetch(self, capsys):
+        release = threading.Event()
+
+        def slow_fetch(word):
+            release.wait(1)
+            return _MOCK_WORD_DATA
+
+        inputs = iter(["2", "3", "4", "apple"])
+
+        def answer(prompt=""):
+            release.set()
+            return next(inputs)
+
+        with patch("spelling_bee._fetch_word_data", side_effect=slow_fetch) as mock_fetch, \
+             patch("builtins.input", side_effect=answer):
+            play_round("apple", MagicMock())
+        out = capsys.readouterr().out
+        assert "test definition" in out
+        assert "This is a test sentence." in out
+        mock_fetch.assert_called_once_with("apple")
+
+    def test_prerenders_the_sentence(self):
+        engine = MagicMock()
+        with patch("spelling_bee._fetch_word_data", return_value=_MOCK_WORD_DATA):
+            spelling_bee._speculate("apple", engine).join(timeout=1)
+        engine.prerender.assert_called_once_with("This is a test sentence.")
+
+    def test_prerender_failure_does_not_break_the_round(self, capsys):
+        engine = MagicMock()
+        engine.prerender.side_effect = OSError("disk full")
+        with patch("spelling_bee._fetch_word_data", return_value=_MOCK_WORD_DATA), \
+             patch("builtins.input", side_effect=["3", "4", "apple"]):
+            play_round("apple", engine)
+        assert "This is a test sentence." in capsys.readouterr().out
+
+    def test_speech_service_prerender_delegates_when_supported(self):
+        inner = MagicMock()
+        inner.prerender.return_value = "/tmp/x.wav"
+        service = SpeechService(inner)
+        try:
+            assert service.prerender("hello") == "/tmp/x.wav"
+        finally:
+            service.close()
+        service = SpeechService(MagicMock(spec=["say", "runAndWait"]))
+        try:
+            assert service.prerender("hello") is None
+        finally:
+            service.close()
+
+
 class TestFindEspeakLibrary:
     @patch("shutil.which", return_value=None)
     def test_returns_none_when_no_binary_found(self, mock_which):
@@ -469,13 +1797,98 @@ class TestInitTtsEngine:
         assert engine is mock_engine
 
 
+class TestCachedEngineResolution:
+    @patch("shutil.which", return_value="/usr/bin/aplay")
+    @patch("spelling_bee._find_espeak_library", return_value="/termux/lib/libespeak-ng.so")
+    @patch("spelling_bee.pyttsx3")
+    def test_reuses_library_path_on_next_launch(self, mock_pyttsx3, mock_find, mock_which):
+        mock_engine = MagicMock()
+        mock_pyttsx3.init.side_effect = [RuntimeError("eSpeak not installed"), mock_engine]
+        init_tts_engine()
+        mock_pyttsx3.init.reset_mock()
+        mock_pyttsx3.init.side_effect = None
+        mock_pyttsx3.init.return_value = mock_engine
+        mock_find.reset_mock()
+        with patch("os.path.isfile", return_value=True):
+            assert init_tts_engine() is mock_engine
+        mock_pyttsx3.init.assert_called_once()
+        mock_find.assert_not_called()
+
+    @patch("shutil.which", side_effect=lambda b: None if b == "aplay" else "/usr/bin/" + b)
+    @patch("sys.platform", "linux")
+    def test_reuses_subprocess_choice(self, mock_which):
+        init_tts_engine()
+        with patch("spelling_bee.pyttsx3") as mock_pyttsx3:
+            assert isinstance(init_tts_engine(), SubprocessTTS)
+        mock_pyttsx3.init.assert_not_called()
+
+    @patch("shutil.which", return_value="/usr/bin/aplay")
+    @patch("spelling_bee.pyttsx3")
+    def test_invalidated_when_environment_changes(self, mock_pyttsx3, mock_which, monkeypatch):
+        init_tts_engine()
+        assert spelling_bee._load_engine_state() is not None
+        monkeypatch.setenv("PATH", "/elsewhere")
+        assert spelling_bee._load_engine_state() is None
+
+    @patch("shutil.which", return_value="/usr/bin/aplay")
+    @patch("spelling_bee._find_espeak_library", return_value=None)
+    @patch("spelling_bee.pyttsx3")
+    def test_stale_choice_falls_back_to_full_resolution(self, mock_pyttsx3, mock_find, mock_which):
+        mock_engine = MagicMock()
+        spelling_bee._save_state(spelling_bee._ENGINE_STATE, {
+            "fingerprint": spelling_bee._tts_fingerprint(),
+            "backend": "pyttsx3-library", "lib_path": "/gone/libespeak.so",
+        })
+        mock_pyttsx3.init.return_value = mock_engine
+        assert init_tts_engine() is mock_engine
+
+    def test_voice_id_remembered(self):
+        engine = MagicMock()
+        female_voice = MagicMock()
+        female_voice.gender = "Female"
+        female_voice.id = "english+f3"
+        engine.getProperty.return_value = [female_voice]
+        configure_voice(engine)
+        second = MagicMock()
+        configure_voice(second)
+        second.getProperty.assert_not_called()
+        second.setProperty.assert_any_call("voice", "english+f3")
+        second.setProperty.assert_any_call("rate", 130)
+
+    def test_removed_voice_looked_up_again(self):
+        engine = MagicMock()
+        old_voice = MagicMock(gender="Female", id="english+f3")
+        engine.getProperty.return_value = [old_voice]
+        configure_voice(engine)
+
+        def set_property(name, value):
+            if name == "voice" and value == "english+f3":
+                raise ValueError("voice not found")
+        second = MagicMock()
+        second.setProperty.side_effect = set_property
+        new_voice = MagicMock(gender="Female", id="english+f4")
+        second.getProperty.return_value = [new_voice]
+        configure_voice(second)
+        second.setProperty.assert_any_call("voice", "english+f4")
+        assert spelling_bee._load_engine_state()["voice_id"] == "english+f4"
+
+    def test_no_female_voice_remembered(self):
+        engine = MagicMock()
+        engine.getProperty.return_value = []
+        configure_voice(engine)
+        second = MagicMock()
+        configure_voice(second)
+        second.getProperty.assert_not_called()
+        assert [c for c in second.setProperty.call_args_list if c[0][0] == "voice"] == []
+
+
 class TestSubprocessTTS:
     def test_has_say_and_run_and_wait_interface(self):
         tts = SubprocessTTS()
         assert hasattr(tts, "say")
         assert hasattr(tts, "runAndWait")
 
-    @patch("subprocess.run")
+    @patch.object(SubprocessTTS, "_run")
     def test_say_and_run_and_wait_calls_subprocess(self, mock_run):
         tts = SubprocessTTS()
         tts.say("hello")
@@ -484,7 +1897,7 @@ class TestSubprocessTTS:
         cmd = mock_run.call_args[0][0]
         assert "hello" in cmd
 
-    @patch("subprocess.run", side_effect=[
+    @patch.object(SubprocessTTS, "_run", side_effect=[
         FileNotFoundError(),
         FileNotFoundError(),
         MagicMock(),
@@ -495,19 +1908,19 @@ class TestSubprocessTTS:
         tts.runAndWait()
         assert mock_run.call_count == 3
 
-    @patch("subprocess.run")
+    @patch.object(SubprocessTTS, "_run")
     def test_run_and_wait_without_say_is_noop(self, mock_run):
         tts = SubprocessTTS()
         tts.runAndWait()
         mock_run.assert_not_called()
 
-    @patch("subprocess.run", side_effect=FileNotFoundError())
+    @patch.object(SubprocessTTS, "_run", side_effect=FileNotFoundError())
     def test_no_crash_when_all_commands_fail(self, mock_run):
         tts = SubprocessTTS()
         tts.say("word")
         tts.runAndWait()  # should not raise
 
-    @patch("subprocess.run")
+    @patch.object(SubprocessTTS, "_run")
     def test_applies_voice_params_to_espeak(self, mock_run):
         tts = SubprocessTTS()
         tts.set_voice_params(rate=130, voice="en+f3")
@@ -518,6 +1931,445 @@ class TestSubprocessTTS:
         assert "-v" in cmd and "en+f3" in cmd
 
 
+_FAKE_ESPEAK = """
+import os, sys
+
+# Like espeak: a text argument, -f or --stdin means read everything and
+# speak it at EOF; with none of them each stdin line is spoken separately
+args = sys.argv[1:]
+whole = False
+while args:
+    arg = args.pop(0)
+    if arg in ("-s", "-v", "-w"):
+        args.pop(0)
+    elif arg in ("--stdin", "-f") or not arg.startswith("-"):
+        whole = True
+log = open(os.environ["FAKE_ESPEAK_LOG"], "a")
+
+def speak(text):
+    log.write(text)
+    log.flush()
+    if "-x" in sys.argv:
+        sys.stdout.write("phonemes\\n")
+        sys.stdout.flush()
+
+if whole:
+    speak(sys.stdin.read())
+else:
+    for line in sys.stdin:
+        speak(line)
+"""
+
+
+class TestPersistentSubprocessTTS:
+    @pytest.fixture
+    def fake_espeak(self, tmp_path, monkeypatch):
+        import sys
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        script = bin_dir / "espeak-ng"
+        script.write_text(f"#!{sys.executable}\n{_FAKE_ESPEAK}")
+        script.chmod(0o755)
+        log = tmp_path / "spoken.txt"
+        log.write_text("")
+        monkeypatch.setenv("FAKE_ESPEAK_LOG", str(log))
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}/usr/bin{os.pathsep}/bin")
+        return log
+
+    @patch.object(SubprocessTTS, "_run")
+    def test_reuses_one_process_for_many_utterances(self, mock_run, fake_espeak):
+        tts = SubprocessTTS(persistent=True)
+        try:
+            for word in ("apple", "garden", "bridge"):
+                tts.say(word)
+                tts.runAndWait()
+            pid = tts._worker._proc.pid
+            tts.say("kitchen")
+            tts.runAndWait()
+            assert tts._worker._proc.pid == pid
+        finally:
+            tts.close()
+        assert fake_espeak.read_text().split() == ["apple", "garden", "bridge", "kitchen"]
+        mock_run.assert_not_called()
+
+    @patch.object(SubprocessTTS, "_run")
+    def test_restarts_worker_that_died(self, mock_run, fake_espeak):
+        tts = SubprocessTTS(persistent=True)
+        try:
+            tts.say("apple")
+            tts.runAndWait()
+            first = tts._worker._proc.pid
+            tts._worker._proc.kill()
+            tts._worker._proc.wait()
+            tts.say("garden")
+            tts.runAndWait()
+            assert tts._worker._proc.pid != first
+        finally:
+            tts.close()
+        assert "garden" in fake_espeak.read_text().split()
+        mock_run.assert_not_called()
+
+    @patch.object(SubprocessTTS, "_run")
+    def test_multiline_text_is_sent_as_one_utterance(self, mock_run, fake_espeak):
+        tts = SubprocessTTS(persistent=True)
+        try:
+            tts.say("one\ntwo")
+            tts.runAndWait()
+        finally:
+            tts.close()
+        assert fake_espeak.read_text() == "one two\n"
+
+    @patch.object(SubprocessTTS, "_run")
+    def test_falls_back_to_one_shot_when_worker_cannot_start(self, mock_run):
+        with patch.object(SubprocessTTS, "_worker_commands", return_value=iter([["/nonexistent/espeak"]])):
+            tts = SubprocessTTS(persistent=True)
+            tts.say("apple")
+            tts.runAndWait()
+        mock_run.assert_called_once()
+        assert tts._worker_unavailable
+
+    def test_voice_change_restarts_worker_with_new_args(self):
+        tts = SubprocessTTS(persistent=True)
+        tts._worker = MagicMock()
+        worker = tts._worker
+        tts.set_voice_params(rate=130, voice="en+f3")
+        worker.close.assert_called_once()
+        assert tts._worker is None
+        cmd = next(tts._worker_commands())
+        assert "-x" in cmd and "130" in cmd and "en+f3" in cmd
+        assert "--stdin" not in cmd  # that would make espeak wait for EOF
+
+
+class TestSubprocessTTSBackendResolution:
+    @staticmethod
+    def _which(available):
+        return lambda name: f"/usr/bin/{name}" if name in available else None
+
+    def test_installed_backend_is_tried_first(self):
+        with patch("shutil.which", side_effect=self._which({"termux-tts-speak"})), \
+                patch("os.path.exists", return_value=True):
+            tts = SubprocessTTS()
+        assert tts._commands[0] == ["termux-tts-speak"]
+        with patch.object(SubprocessTTS, "_run") as mock_run:
+            tts.say("hello")
+            tts.runAndWait()
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0] == ["termux-tts-speak", "hello"]
+
+    def test_discovery_is_cached_across_instances(self):
+        with patch("shutil.which", side_effect=self._which({"espeak"})), \
+                patch("os.path.exists", return_value=True):
+            SubprocessTTS()
+        with patch("shutil.which") as mock_which, \
+                patch("os.path.exists", return_value=True):
+            tts = SubprocessTTS()
+        mock_which.assert_not_called()
+        assert tts._commands[0] == ["espeak"]
+
+    def test_cache_invalidated_when_path_changes(self, monkeypatch):
+        with patch("shutil.which", side_effect=self._which({"espeak"})):
+            SubprocessTTS()
+        monkeypatch.setenv("PATH", "/somewhere/else")
+        with patch("shutil.which", side_effect=self._which({"espeak-ng"})) as mock_which:
+            tts = SubprocessTTS()
+        assert mock_which.called
+        assert tts._commands[0] == ["espeak-ng"]
+
+    def test_cache_invalidated_when_binary_disappears(self):
+        with patch("shutil.which", side_effect=self._which({"espeak"})):
+            SubprocessTTS()
+        with patch("shutil.which", side_effect=self._which({"espeak-ng"})) as mock_which:
+            tts = SubprocessTTS()   # /usr/bin/espeak does not really exist
+        assert mock_which.called
+        assert tts._commands[0] == ["espeak-ng"]
+
+    def test_failover_promotes_working_backend(self):
+        with patch("shutil.which", side_effect=self._which({"espeak-ng"})), \
+                patch("os.path.exists", return_value=True):
+            tts = SubprocessTTS()
+            with patch.object(SubprocessTTS, "_run", side_effect=[
+                subprocess.CalledProcessError(1, "espeak-ng"), MagicMock(),
+            ]):
+                tts.say("hello")
+                tts.runAndWait()
+            assert tts._commands[0] == ["espeak"]
+            with patch.object(SubprocessTTS, "_run") as mock_run:
+                tts.say("again")
+                tts.runAndWait()
+            assert mock_run.call_args[0][0][0] == "espeak"
+            assert SubprocessTTS()._commands[0] == ["espeak"]
+
+
+class TestAudioCache:
+    def _render(self, content):
+        def render(path):
+            with open(path, "wb") as f:
+                f.write(content)
+        return render
+
+    def test_miss_then_hit(self, tmp_path):
+        cache = AudioCache(str(tmp_path))
+        assert cache.get("hello", 130, "en+f3", "espeak-ng") is None
+        path = cache.render("hello", 130, "en+f3", "espeak-ng", self._render(b"RIFF"))
+        assert cache.get("hello", 130, "en+f3", "espeak-ng") == path
+
+    def test_key_includes_voice_settings(self, tmp_path):
+        cache = AudioCache(str(tmp_path))
+        paths = {cache.path_for("hello", rate, voice, backend)
+                 for rate, voice, backend in [(130, "en", "espeak"), (150, "en", "espeak"),
+                                              (130, "en+f3", "espeak"), (130, "en", "espeak-ng")]}
+        assert len(paths) == 4
+
+    def test_evicts_least_recently_played_over_budget(self, tmp_path):
+        import os
+        cache = AudioCache(str(tmp_path), max_bytes=250)
+        first = cache.render("one", None, None, "espeak", self._render(b"x" * 100))
+        os.utime(first, (1, 1))
+        second = cache.render("two", None, None, "espeak", self._render(b"x" * 100))
+        os.utime(second, (2, 2))
+        cache.get("one", None, None, "espeak")   # replaying refreshes "one"
+        cache.render("three", None, None, "espeak", self._render(b"x" * 100))
+        assert cache.get("one", None, None, "espeak") is not None
+        assert cache.get("two", None, None, "espeak") is None
+        assert cache.size() <= 250
+
+    def test_failed_render_leaves_nothing_behind(self, tmp_path):
+        cache = AudioCache(str(tmp_path))
+
+        def broken(path):
+            with open(path, "wb") as f:
+                f.write(b"partial")
+            raise subprocess.CalledProcessError(1, "espeak")
+
+        with pytest.raises(subprocess.CalledProcessError):
+            cache.render("hello", None, None, "espeak", broken)
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestSubprocessTTSAudioCache:
+    @pytest.fixture
+    def tts(self, tmp_path):
+        which = lambda name: f"/usr/bin/{name}" if name in ("espeak-ng", "aplay") else None
+        with patch("shutil.which", side_effect=which), patch("os.path.exists", return_value=True):
+            tts = SubprocessTTS(audio_cache=AudioCache(str(tmp_path / "audio")))
+        tts.set_voice_params(rate=130, voice="en+f3")
+        return tts
+
+    @staticmethod
+    def _fake_run(cmd, **kwargs):
+        if "-w" in cmd:
+            with open(cmd[cmd.index("-w") + 1], "wb") as f:
+                f.write(b"RIFF")
+        return MagicMock()
+
+    def test_renders_once_then_replays(self, tts):
+        with patch("subprocess.run", side_effect=self._fake_run) as mock_render, \
+                patch.object(SubprocessTTS, "_run") as mock_play:
+            for _ in range(3):
+                tts.say("I ate an apple.")
+                tts.runAndWait()
+        mock_render.assert_called_once()
+        render = mock_render.call_args[0][0]
+        assert render[0] == "espeak-ng"
+        assert "-w" in render and "130" in render and "en+f3" in render
+        plays = [c[0][0] for c in mock_play.call_args_list]
+        assert len(plays) == 3
+        assert all(cmd[0] == "aplay" for cmd in plays)
+
+    def test_prerender_fills_cache_without_playing(self, tts):
+        with patch("subprocess.run", side_effect=self._fake_run), \
+                patch.object(SubprocessTTS, "_run") as mock_play:
+            path = tts.prerender("garden")
+        assert path is not None
+        mock_play.assert_not_called()
+
+    def test_falls_back_to_direct_speech_when_render_impossible(self, tts):
+        with patch("subprocess.run", side_effect=FileNotFoundError()) as mock_render, \
+                patch.object(SubprocessTTS, "_run") as mock_speak:
+            tts.say("hello")
+            tts.runAndWait()
+            tts.say("hello")
+            tts.runAndWait()
+        assert mock_render.call_count == 2   # espeak-ng and espeak each tried once, then skipped
+        assert mock_speak.call_count == 2
+        assert mock_speak.call_args[0][0][-1] == "hello"
+
+
+class TestRenderAudio:
+    @pytest.fixture
+    def fake_espeak_on_path(self, tmp_path, monkeypatch):
+        import os
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        script = bin_dir / "espeak-ng"
+        script.write_text(
+            "#!/bin/sh\n"
+            "while [ $# -gt 0 ]; do\n"
+            "  if [ \"$1\" = -w ]; then shift; printf RIFF > \"$1\"; fi\n"
+            "  shift\n"
+            "done\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}/usr/bin{os.pathsep}/bin")
+        return tmp_path
+
+    def test_renders_words_and_cached_sentences(self, fake_espeak_on_path, capsys):
+        _word_cache["apple"] = WordRecord("a fruit", "I ate an apple.", "noun")
+        failed = render_audio(["apple", "garden"], workers=2)
+        out = capsys.readouterr().out
+        assert failed == 0
+        assert "Rendered 3" in out
+        assert "utterances/s" in out
+        tts = SubprocessTTS(audio_cache=AudioCache(str(fake_espeak_on_path / "cache" / "audio")))
+        configure_voice(tts)
+        for text in ("apple", "garden", "I ate an apple."):
+            assert tts.cached_audio(text) is not None
+
+    def test_second_run_skips_rendered_entries(self, fake_espeak_on_path, capsys):
+        render_audio(["apple", "garden"], workers=2)
+        capsys.readouterr()
+        render_audio(["apple", "garden", "bridge"], workers=2)
+        out = capsys.readouterr().out
+        assert "Rendered 1, already cached 2" in out
+
+    def test_stops_early_when_everything_would_not_fit(self, fake_espeak_on_path, capsys):
+        # The fake espeak writes 4 bytes per utterance
+        words = [f"w{i:03d}" for i in range(100)]
+        assert render_audio(words, workers=2, max_bytes=300) == 100 - spelling_bee._RENDER_PILOT
+        out = capsys.readouterr().out
+        assert "need about 400 bytes" in out
+        assert f"Rendered {spelling_bee._RENDER_PILOT}," in out
+        cache = AudioCache(str(fake_espeak_on_path / "cache" / "audio"))
+        assert cache.size() == 4 * spelling_bee._RENDER_PILOT
+
+    def test_reports_failures_without_espeak(self, monkeypatch, tmp_path, capsys):
+        monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+        assert render_audio(["apple"], workers=1) == 1
+        assert "failed 1" in capsys.readouterr().out
+
+
+_SCORING_PAIRS = [
+    ("apple", "apple"), ("apple", "aple"), ("Apple", " APPLE "), ("apple", ""),
+    ("apple", "applesauce"), ("bee", "bea"), ("cat", "c a t"), ("naïve", "naive"),
+    ("İ", "i\u0307"), ("straße", "STRASSE"), ("zebra", "zébra"),
+]
+
+
+class TestScoreBatch:
+    def _reference(self, pairs):
+        return [(check_spelling(word, attempt),) + compare(word, attempt.strip())
+                for word, attempt in pairs]
+
+    def _assert_matches_reference(self, pairs):
+        correct, masks, accuracy = score_batch(*zip(*pairs))
+        for ok, mask, acc, (ref_ok, ref_matches, ref_acc) in zip(
+                correct, masks, accuracy, self._reference(pairs)):
+            assert ok == ref_ok
+            assert [digit == "1" for digit in mask] == ref_matches
+            assert acc == ref_acc
+
+    def test_vectorized_matches_single_pair_functions(self):
+        pytest.importorskip("numpy")
+        self._assert_matches_reference(_SCORING_PAIRS)
+
+    def test_vectorized_all_ascii_batch(self):
+        pytest.importorskip("numpy")
+        rng = random.Random(7)
+        pairs = []
+        for word in WORD_LIST[:500]:
+            attempt = rng.choice([word, word.upper(), word[:-1], word + "s",
+                                  word[::-1], f" {word}", ""])
+            pairs.append((word, attempt))
+        self._assert_matches_reference(pairs)
+
+    def test_pure_python_fallback(self):
+        with patch("spelling_bee._numpy", return_value=None):
+            self._assert_matches_reference(_SCORING_PAIRS)
+
+    def test_rejects_bad_input(self):
+        with pytest.raises(ValueError):
+            score_batch(["apple"], [])
+        with pytest.raises(ValueError):
+            score_batch(["", "apple"], ["a", "apple"])
+        assert score_batch([], []) == ([], [], [])
+
+
+class TestGradeAttempts:
+    def _grade(self, text, fmt="csv"):
+        out, report = io.StringIO(), io.StringIO()
+        failed = grade_attempts(io.StringIO(text), out, fmt, report=report)
+        return failed, out.getvalue(), report.getvalue()
+
+    def test_grades_csv_rows(self):
+        failed, out, report = self._grade("expected,attempt\napple,apple\napple,aple\n")
+        assert failed == 0
+        assert out.splitlines() == [
+            "expected,attempt,correct,matches,accuracy",
+            "apple,apple,1,11111,100.0",
+            "apple,aple,0,11000,40.0",
+        ]
+        assert "Graded 2 attempts: 1 correct (50.0%), mean accuracy 70.0%" in report
+
+    def test_csv_header_is_optional(self):
+        _, out, _ = self._grade("apple,APPLE\n")
+        assert out.splitlines()[1] == "apple,APPLE,1,11111,100.0"
+
+    def test_first_row_spelling_word_is_not_a_header(self):
+        _, out, report = self._grade("word,wurd\nexpected,expected\n")
+        assert out.splitlines()[1:] == ["word,wurd,0,1011,75.0",
+                                        "expected,expected,1,11111111,100.0"]
+        assert "Graded 2 attempts" in report
+
+    def test_grades_jsonl_rows(self):
+        text = '{"expected": "apple", "attempt": "appel"}\n\n{"expected": "cat", "attempt": "cat"}\n'
+        failed, out, _ = self._grade(text, "jsonl")
+        assert failed == 0
+        rows = [json.loads(line) for line in out.splitlines()]
+        assert rows == [
+            {"expected": "apple", "attempt": "appel", "correct": False,
+             "matches": "11100", "accuracy": 60.0},
+            {"expected": "cat", "attempt": "cat", "correct": True,
+             "matches": "111", "accuracy": 100.0},
+        ]
+
+    def test_skips_and_reports_malformed_rows(self):
+        failed, out, report = self._grade("apple,apple\nonly-one-column\n,attempt\nbee,bea\n")
+        assert failed == 2
+        assert len(out.splitlines()) == 3
+        assert "Skipped 2 malformed rows (lines 2, 3)" in report
+        failed, _, _ = self._grade('{"expected": "apple"}\nnot json\n{"expected": 1, "attempt": "a"}\n',
+                                   "jsonl")
+        assert failed == 3
+
+    def test_streams_rows(self):
+        out = io.StringIO()
+
+        def lines():
+            yield "apple,apple\n"
+            # The first result is written before the next row is read
+            assert "apple,apple,1" in out.getvalue()
+            yield "bee,bee\n"
+
+        grade_attempts(lines(), out, report=io.StringIO(), chunk_size=1)
+        assert out.getvalue().count("\n") == 3
+
+    def test_alignment_mode(self):
+        out = io.StringIO()
+        grade_attempts(io.StringIO("giraffe,jirafe\n"), out, mode="alignment",
+                       report=io.StringIO())
+        assert out.getvalue().splitlines()[1] == "giraffe,jirafe,0,X===D==,71.4"
+
+    def test_grade_subcommand(self, tmp_path, capsys):
+        source = tmp_path / "attempts.jsonl"
+        source.write_text('{"expected": "apple", "attempt": "apple"}\n')
+        output = tmp_path / "results.jsonl"
+        with pytest.raises(SystemExit) as excinfo:
+            main(["grade", str(source), "--output", str(output)])
+        assert excinfo.value.code == 0
+        assert json.loads(output.read_text())["correct"] is True
+        assert "Graded 1 attempts" in capsys.readouterr().err
+
+
 class TestWordList:
     """Validate the curated WORD_LIST meets basic quality requirements."""
 
@@ -536,6 +2388,39 @@ class TestWordList:
         assert len(WORD_LIST) == len(set(WORD_LIST)), "WORD_LIST contains duplicates"
 
 
+class TestLazyImports:
+    def test_bare_import_skips_heavy_modules(self):
+        import benchmarks
+        assert benchmarks.loaded_heavy_modules() == []
+
+    def test_placeholder_replaces_itself_on_first_use(self):
+        spelling_bee.colorsys = spelling_bee._LazyImport("colorsys")
+        try:
+            assert spelling_bee.colorsys.rgb_to_hsv(0, 0, 0) == (0, 0, 0)
+            import colorsys
+            assert spelling_bee.colorsys is colorsys
+        finally:
+            del spelling_bee.colorsys
+
+    def test_placeholder_for_a_name_is_callable(self):
+        placeholder = spelling_bee._LazyImport("os.path", "join")
+        assert placeholder("a", "b") == os.path.join("a", "b")
+
+    def test_parses_importtime_tree(self):
+        from benchmarks import direct_imports, parse_importtime
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 | site\n"
+            "import time:        30 |         30 |     _struct\n"
+            "import time:        50 |         80 |   struct\n"
+            "import time:        20 |         20 |   mmap\n"
+            "import time:       400 |        500 | spelling_bee\n"
+        )
+        rows = parse_importtime(stderr)
+        assert rows[-1] == ("spelling_bee", 0, 400, 500)
+        assert [row[0] for row in direct_imports(rows, "spelling_bee")] == ["struct", "mmap"]
+
+
 # ---------------------------------------------------------------------------
 # Realistic mock tests — verify definitions and sentences are parsed
 # correctly from real API response structures for common words
@@ -639,6 +2524,99 @@ class TestGetWordReturnsValidatedWord:
             assert word in WORD_LIST
 
 
+class _FakeClient:
+    """Answers like the dictionary API from _REALISTIC_RESPONSES, after ``errors``."""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, word):
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+        if error is not None:
+            raise error
+        if word not in _REALISTIC_RESPONSES:
+            raise DictionaryAPIError(404, "Not Found")
+        return _REALISTIC_RESPONSES[word]
+
+
+class TestPlay:
+    @patch("builtins.input", side_effect=["y", "y", "y", "n"])
+    @patch("spelling_bee.play_round")
+    @patch("spelling_bee.dictionary_status",
+           side_effect=["open", "half-open", "open", "closed"])
+    @patch("spelling_bee.WordPrefetcher")
+    @patch("spelling_bee.SpeechService")
+    @patch("spelling_bee.LoopingEngine")
+    @patch("spelling_bee.configure_voice")
+    @patch("spelling_bee.init_tts_engine")
+    def test_half_open_breaker_is_still_degraded(self, mock_init, mock_voice, mock_looping,
+                                                 mock_speech, mock_prefetcher, mock_status,
+                                                 mock_round, mock_input, capsys):
+        spelling_bee.play()
+        out = capsys.readouterr().out
+        assert out.count("Dictionary unavailable") == 1
+        assert out.count("Dictionary back online") == 1
+        assert mock_round.call_count == 4
+
+
+class TestWarmCache:
+    def test_writes_bundle_and_reports_gaps(self, tmp_path, capsys, monkeypatch):
+        monkeypatch.setattr(spelling_bee, "_dictionary_client", _FakeClient())
+        path = str(tmp_path / "words.bundle")
+        _REALISTIC_RESPONSES["nodefs"] = [{"meanings": [{"partOfSpeech": "noun", "definitions": [
+            {"definition": "no example here"}]}]}]
+        try:
+            failed = warm_cache(["happy", "garden", "nodefs", "zzzz"], path, workers=4,
+                                base_delay=0)
+        finally:
+            del _REALISTIC_RESPONSES["nodefs"]
+        out = capsys.readouterr().out
+        assert failed == 1
+        assert "Could not fetch (1): zzzz" in out
+        assert "Missing example (1): nodefs" in out
+        bundle = WordBundle(path)
+        assert len(bundle) == 3
+        assert bundle.get("happy").definition.startswith("Feeling")
+
+    def test_retries_transient_errors_past_the_circuit_breaker(self, tmp_path, monkeypatch):
+        client = _FakeClient([DictionaryAPIError(429, "Too Many Requests")] * 2
+                             + [ConnectionResetError()])
+        monkeypatch.setattr(spelling_bee, "_dictionary_client", client)
+        path = str(tmp_path / "words.bundle")
+        failed = warm_cache(COMMON_WORDS, path, workers=2, base_delay=0)
+        assert failed == 0
+        assert client.calls == len(COMMON_WORDS) + 3
+        assert len(WordBundle(path)) == len(COMMON_WORDS)
+
+    def test_gives_up_after_repeated_errors(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(spelling_bee, "_dictionary_client",
+                            _FakeClient([DictionaryAPIError(503, "Unavailable")] * 4))
+        failed = warm_cache(["happy", "garden"], str(tmp_path / "words.bundle"),
+                            workers=1, base_delay=0)
+        assert failed == 1
+
+    def test_keeps_old_bundle_when_almost_nothing_was_fetched(self, tmp_path, capsys):
+        path = tmp_path / "words.bundle"
+        path.write_bytes(b"old bundle")
+        failed = warm_cache(COMMON_WORDS, str(path), base_delay=0)
+        assert failed == len(COMMON_WORDS)
+        assert "not writing" in capsys.readouterr().out
+        assert path.read_bytes() == b"old bundle"
+
+    def test_warm_subcommand(self, tmp_path, capsys, monkeypatch):
+        monkeypatch.setattr(spelling_bee, "_dictionary_client", _FakeClient())
+        path = str(tmp_path / "words.bundle")
+        with patch("spelling_bee.WORD_LIST", COMMON_WORDS):
+            with pytest.raises(SystemExit) as excinfo:
+                main(["warm", "--output", path, "--workers", "2"])
+        assert excinfo.value.code == 0
+        assert len(WordBundle(path)) == len(COMMON_WORDS)
+
+
 # ---------------------------------------------------------------------------
 # Live integration tests — hit the real Free Dictionary API
 # Skipped automatically when the API is unreachable.
@@ -713,3 +2691,45 @@ class TestGetWordIntegration:
         word = get_word()
         assert get_definition(word) is not None, f"'{word}' has no definition"
         assert get_sentence(word) is not None, f"'{word}' has no sentence"
+
+
+def _espeak_can_play():
+    """Return True if espeak-ng is installed and can reach a sound device."""
+    import shutil
+    if not shutil.which("espeak-ng"):
+        return False
+    try:
+        return subprocess.run(["espeak-ng", "-a", "0", "ok"], capture_output=True,
+                              timeout=10).returncode == 0
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(not _espeak_can_play(), reason="espeak-ng or a sound device is missing")
+class TestEspeakWorkerIntegration:
+    """Run the persistent worker against the real espeak-ng."""
+
+    def _duration(self, tmp_path, text):
+        import wave
+        path = str(tmp_path / "utterance.wav")
+        subprocess.run(["espeak-ng", "-w", path, text], check=True, capture_output=True)
+        with wave.open(path) as f:
+            return f.getnframes() / f.getframerate()
+
+    def test_worker_answers_each_line_after_playing_it(self, tmp_path):
+        import time
+        text = "The quick brown fox jumps over the lazy dog."
+        expected = self._duration(tmp_path, text)
+        tts = SubprocessTTS(persistent=True)
+        try:
+            for _ in range(2):
+                start = time.monotonic()
+                tts.say(text)
+                tts.runAndWait()
+                elapsed = time.monotonic() - start
+                assert not tts._worker_unavailable
+                # Answering before the audio ends would let the menu talk over it
+                assert expected * 0.8 <= elapsed < expected + 10
+        finally:
+            tts.close()